@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Python API
+
+The parts drawn on documents kept in memory, without a command line or a
+stdin/stdout round trip. A spec is a dict of the .inx parameters, with
+Python values; the documents are lxml trees as inkex loads them:
+
+    from spd_api import add_jack, add_knob, add_knob_scale, main_shape, render_panel, tostring
+
+    tree = render_panel({'panel_type': 'e3u', 'eurorack_panel_hp': 12, 'panel_holes': True})
+    add_knob(tree, {'knob_name': 'Cutoff', 'knob_pos_define': True, 'knob_pos_x': 30, 'knob_pos_y': 40})
+    add_knob_scale(tree, {'knob_scale_add_label': True}, main_shape(tree, 'knob', 'Cutoff'))
+    add_jack(tree, {'jack_name': 'IN', 'jack_pos_define': True, 'jack_pos_x': 30, 'jack_pos_y': 100})
+    open('vcf.svg', 'wb').write(tostring(tree))
+
+Every call draws with a new extension instance, so calls can be repeated in
+one process. What the extension reports goes to stderr as usual.
+'''
+
+import os
+from types import SimpleNamespace
+
+import inkex
+
+from spd_schema import PART_PAGES, Options, load_schema, param_text
+from SynthPanelsDesigner import SynthPanelEffect
+
+INX = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'SynthPanelsDesigner.inx')
+
+BLANK = (
+    '<svg xmlns="http://www.w3.org/2000/svg" xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape" '
+    'xmlns:sodipodi="http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd" width="{width}mm" height="{height}mm" '
+    'viewBox="0 0 {width} {height}"><sodipodi:namedview id="namedview" inkscape:document-units="mm" '
+    'inkscape:current-layer="layer1"/><g inkscape:groupmode="layer" id="layer1" inkscape:label="Layer 1"/></svg>'
+)
+
+
+class _PlanEffect(SynthPanelEffect):
+    # keeps the dry run plans instead of printing them
+
+    def __init__(self):
+        super().__init__()
+        self.plans = []
+
+    def dry_run(self, plan):
+        self.plans.append(plan)
+        return False
+
+
+def new_document(width=300, height=200):
+    # Empty document of width x height mm
+    return inkex.load_svg(BLANK.format(width=width, height=height).encode('utf-8'))
+
+
+def load(source):
+    # Document from a path, a file object or the SVG text
+    if isinstance(source, str) and not source.lstrip().startswith('<'):
+        with open(source, 'rb') as stream:
+            return inkex.load_svg(stream)
+    return inkex.load_svg(source)
+
+
+def tostring(tree):
+    # The document as the extension writes it
+    return tree.getroot().tostring()
+
+
+def main_shape(tree, component, name):
+    # What a scale is drawn around, as selected in Inkscape: the main circle of a knob or the coarse of a slider
+    sublayer = {'knob': 'Main color', 'slider': 'Coarse'}[component]
+    for layer in tree.getroot().iter('{http://www.w3.org/2000/svg}g'):
+        if layer.get('data-spd-component') == component and layer.get('data-spd-name') == name:
+            for child in layer:
+                if child.label == sublayer and len(child):
+                    return child[0]
+    return None
+
+
+def options(part, spec=None, ids=()):
+    # Extension options of a part and a spec, converted like the command line
+    schema = load_schema(INX)
+    values = {name: param_text(value) for name, value in (spec or {}).items()}
+    unknown = sorted(name for name in values if name not in schema)
+    if unknown:
+        raise ValueError('Unknown parameters: {}'.format(', '.join(unknown)))
+    values['part'] = str(part)
+    namespace = SimpleNamespace(ids=list(ids), selected_nodes=[], input_file=None, output=None)
+    result = Options(schema, values, namespace)
+    result.convert(PART_PAGES.get(part))
+    return result
+
+
+def _id(element):
+    return element if isinstance(element, str) else element.get_id()
+
+
+def _run(effect, tree, part, spec, ids, layer=None):
+    effect.options = options(part, spec, ids)
+    effect.document = tree
+    effect.svg = tree.getroot()
+    effect.svg.selection.set(*ids)
+    effect.selection_layer = layer
+    return effect.effect()
+
+
+def selection_layer(tree, ids):
+    # The layer of the first selected element, the scales are named after it as when it's clicked in Inkscape
+    selected = tree.getroot().getElementById(ids[0]) if ids else None
+    return selected.getparent() if selected is not None else None
+
+
+def draw(tree, part, spec=None, ids=(), layer=None):
+    # Draw a part into the document, the ids are the selection (the knob or the slider of a scale);
+    # the selection is taken as made in `layer`, in the document's current layer when None
+    _run(SynthPanelEffect(), tree, part, spec, ids, layer)
+    return tree
+
+
+def plans(tree, part, spec=None, ids=()):
+    # Plans of a part (spd_plan.Plan) without drawing it, one per selected knob for the knob scales
+    effect = _PlanEffect()
+    _run(effect, tree, part, dict(spec or {}, dry_run=True), ids, selection_layer(tree, ids))
+    return effect.plans
+
+
+def plan(tree, part, spec=None, ids=()):
+    # Plan of a panel, scale or jack without drawing it, None for knobs and sliders
+    drawn = plans(tree, part, spec, ids)
+    return drawn[0] if drawn else None
+
+
+def render_panel(spec):
+    # New document with a panel, the part fits the page to the panel
+    return draw(new_document(), 1, spec)
+
+
+def add_knob(tree, spec):
+    return draw(tree, 2, spec)
+
+
+def add_knob_scale(tree, spec, knob):
+    # knob: the id or the element of the knob's main circle, or a list of them for one scale on each
+    knobs = knob if isinstance(knob, (list, tuple)) else [knob]
+    ids = [_id(knob) for knob in knobs]
+    return draw(tree, 3, spec, ids, selection_layer(tree, ids))
+
+
+def add_slider(tree, spec):
+    return draw(tree, 4, spec)
+
+
+def add_slider_scale(tree, spec, slider):
+    # slider: the id or the element of the slider's coarse
+    ids = [_id(slider)]
+    return draw(tree, 5, spec, ids, selection_layer(tree, ids))
+
+
+def add_jack(tree, spec):
+    return draw(tree, 6, spec)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Startup benchmark
+
+Inkscape starts the extension in a new process on every Apply and every live
+preview update, so what the user waits for is the time from the interpreter
+start to the first byte of output. This script measures it for each part on
+a small generated document, next to the floor of an empty interpreter and of
+importing inkex alone:
+
+    python spd_benchmark.py --runs 10 --part 1 --part 3
+
+--suite draws in this process instead (spd_api), scenario by scenario: every
+panel format, the knob, slider and jack, scales swept over their tick and
+subtick counts, up to 500 components on one page and a knob scale drawn on
+documents that already hold up to 10000 elements. Each scenario records the
+best wall time, the peak memory (tracemalloc), the node count and the
+output bytes. --json writes them; with --baseline (a file written by --json)
+the run fails when a scenario got slower or bigger than --threshold allows:
+
+    python spd_benchmark.py --suite --json baseline.json
+    python spd_benchmark.py --suite --baseline baseline.json --threshold 0.25
+'''
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'SynthPanelsDesigner.py')
+
+# a knob and a slider already drawn, {layer} is the current layer
+DOCUMENT = (
+    '<svg xmlns="http://www.w3.org/2000/svg" xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape" '
+    'xmlns:sodipodi="http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd" width="200mm" height="150mm" viewBox="0 0 200 150">'
+    '<sodipodi:namedview id="namedview" inkscape:document-units="mm" inkscape:current-layer="{layer}"/>'
+    '<g inkscape:groupmode="layer" id="layer1" inkscape:label="Layer 1"/>'
+    '<g inkscape:groupmode="layer" inkscape:label="Knobs Group" id="knobs-group">'
+    '<g inkscape:groupmode="layer" inkscape:label="Cutoff"><g inkscape:groupmode="layer" inkscape:label="Main color" id="knob-color">'
+    '<circle id="knob" cx="60" cy="75" r="6" style="fill:#fefefe;stroke:#333333;stroke-width:1"/></g></g></g>'
+    '<g inkscape:groupmode="layer" inkscape:label="Sliders Group" id="sliders-group">'
+    '<g inkscape:groupmode="layer" inkscape:label="Gain"><g inkscape:groupmode="layer" inkscape:label="Coarse" id="slider-coarse">'
+    '<rect id="slider" x="137.5" y="25.5" width="5" height="99" style="fill:#fefefe;stroke:#333333;stroke-width:1"/></g></g></g>'
+    '</svg>'
+)
+
+# part: (name, current layer, arguments)
+PARTS = {
+    1: ('panel', 'layer1', ['--panel_type=e3u', '--eurorack_panel_hp=12', '--panel_holes=true', '--panel_screws=true']),
+    2: ('knob', 'layer1', ['--knob_name=Bench', '--knob_add_tick=true']),
+    3: ('knob scale', 'knob-color', ['--id=knob', '--knob_scale_add_ticks=true', '--knob_scale_ticks_number=11',
+                                     '--knob_scale_add_label=true']),
+    4: ('slider', 'layer1', ['--slider_name=Bench']),
+    5: ('slider scale', 'slider-coarse', ['--id=slider', '--slider_scale_add_subticks=true', '--slider_scale_add_label=true']),
+    6: ('jack', 'layer1', ['--jack_name=Bench']),
+}
+
+
+def first_output(command):
+    # (seconds to the first byte of stdout, seconds to the exit) of a command
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    process.stdout.read(1)
+    first = time.perf_counter() - start
+    process.stdout.read()
+    process.wait()
+    return first, time.perf_counter() - start
+
+
+def measure(command, runs, warmup=1):
+    for _ in range(warmup):
+        first_output(command)
+    return [first_output(command) for _ in range(runs)]
+
+
+def part_command(part, directory):
+    name, layer, arguments = PARTS[part]
+    path = os.path.join(directory, 'part{}.svg'.format(part))
+    with open(path, 'w') as stream:
+        stream.write(DOCUMENT.format(layer=layer))
+    return [sys.executable, SCRIPT, '--part={}'.format(part)] + arguments + [path]
+
+
+def benchmark(parts, runs):
+    # Yield (name, [(first output, exit), ...]) of the floors and of every part
+    floors = [
+        ('python', [sys.executable, '-c', 'print()']),
+        ('import inkex', [sys.executable, '-c', 'import inkex; print()']),
+    ]
+    for name, command in floors:
+        yield name, measure(command, runs)
+    with tempfile.TemporaryDirectory() as directory:
+        for part in parts:
+            yield '{} {}'.format(part, PARTS[part][0]), measure(part_command(part, directory), runs)
+
+
+PANEL_TYPES = ('e3u', 'e1uij', 'e1upl', 'm5u', 'd5u', 'buchla', 'serge', 'lw', 'fracrack', 'api', 'nineteen', 'hammond', 'custom')
+TICKS = (10, 30, 100, 300, 1000)
+SUBTICKS = (0, 1, 4, 9)
+COMPONENTS = (1, 10, 100, 500)
+ELEMENTS = (0, 1000, 10000)
+
+KNOB_SCALE = {'knob_scale_add_ticks': True, 'knob_scale_add_label': True, 'knob_scale_add_arc': True}
+SLIDER_SCALE = {'slider_scale_add_label': True}
+
+# slower or bigger than the baseline by less than this is noise
+SLACK = {'wall_ms': 1.0, 'peak_kb': 64.0, 'nodes': 0, 'bytes': 0}
+
+
+def filled_document(elements):
+    # Blank page holding `elements` circles on a layer of its own
+    import inkex
+    import spd_api
+    tree = spd_api.new_document()
+    layer = tree.getroot().add(inkex.Layer.new('Existing'))
+    for index in range(elements):
+        layer.append(inkex.Circle(cx=str(index % 300), cy=str(index // 300 % 200), r='0.5'))
+    return tree
+
+
+def with_knob(elements=0):
+    import spd_api
+    tree = filled_document(elements)
+    spd_api.add_knob(tree, {'knob_name': 'Bench', 'knob_pos_define': True, 'knob_pos_x': 100, 'knob_pos_y': 100})
+    return tree
+
+
+def with_slider():
+    import spd_api
+    tree = spd_api.new_document()
+    spd_api.add_slider(tree, {'slider_name': 'Bench', 'slider_pos_define': True, 'slider_pos_x': 100, 'slider_pos_y': 100})
+    return tree
+
+
+def knob_scale(spec):
+    import spd_api
+    return lambda tree: spd_api.add_knob_scale(tree, dict(KNOB_SCALE, **spec), spd_api.main_shape(tree, 'knob', 'Bench'))
+
+
+def slider_scale(spec):
+    import spd_api
+    return lambda tree: spd_api.add_slider_scale(tree, dict(SLIDER_SCALE, **spec), spd_api.main_shape(tree, 'slider', 'Bench'))
+
+
+def many_knobs(count):
+    import spd_api
+
+    def draw(tree):
+        for index in range(count):
+            spd_api.add_knob(tree, {'knob_name': 'K{}'.format(index), 'knob_pos_define': True,
+                                    'knob_pos_x': 10 + index % 28 * 10, 'knob_pos_y': 10 + index // 28 % 18 * 10})
+    return draw
+
+
+def scenarios():
+    # Yield (name, setup, draw): setup() makes the document, only draw(document) is measured
+    import spd_api
+    for panel_type in PANEL_TYPES:
+        spec = {'panel_type': panel_type, 'eurorack_panel_hp': 12, 'panel_holes': True, 'panel_screws': True, 'panel_centers': True}
+        yield 'panel {}'.format(panel_type), spd_api.new_document, lambda tree, spec=spec: spd_api.draw(tree, 1, spec)
+    yield 'knob', spd_api.new_document, lambda tree: spd_api.add_knob(tree, {'knob_name': 'Bench', 'knob_add_tick': True})
+    yield 'slider', spd_api.new_document, lambda tree: spd_api.add_slider(tree, {'slider_name': 'Bench'})
+    yield 'jack', spd_api.new_document, lambda tree: spd_api.add_jack(tree, {'jack_name': 'Bench', 'jack_nut_type': 1})
+    for ticks in TICKS:
+        yield 'knob scale {} ticks'.format(ticks), with_knob, knob_scale({'knob_scale_ticks_number': ticks})
+        yield 'slider scale {} ticks'.format(ticks), with_slider, slider_scale({'slider_scale_ticks_number': ticks})
+    for subticks in SUBTICKS:
+        yield ('knob scale 30 ticks {} subticks'.format(subticks), with_knob,
+               knob_scale({'knob_scale_ticks_number': 30, 'knob_scale_add_subticks': subticks > 0, 'knob_scale_subticks_number': subticks or 1}))
+        yield ('slider scale 30 ticks {} subticks'.format(subticks), with_slider,
+               slider_scale({'slider_scale_ticks_number': 30, 'slider_scale_add_subticks': subticks > 0, 'slider_scale_subticks_number': subticks or 1}))
+    for count in COMPONENTS:
+        yield '{} knobs'.format(count), spd_api.new_document, many_knobs(count)
+    for elements in ELEMENTS:
+        yield 'knob scale on {} elements'.format(elements), lambda elements=elements: with_knob(elements), knob_scale({})
+
+
+def run_scenario(setup, draw, runs):
+    # Measures of one scenario: best and median wall time, peak memory, nodes and bytes of the result
+    import spd_api
+    draw(setup())  # warm-up, the first draw imports the plans
+    times = []
+    for _ in range(runs):
+        tree = setup()
+        start = time.perf_counter()
+        draw(tree)
+        times.append((time.perf_counter() - start) * 1000)
+    tree = setup()
+    tracemalloc.start()
+    try:
+        draw(tree)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'wall_ms': round(min(times), 3),
+        'median_ms': round(statistics.median(times), 3),
+        'peak_kb': round(peak / 1024.0, 1),
+        'nodes': sum(1 for _ in tree.getroot().iter()),
+        'bytes': len(spd_api.tostring(tree)),
+    }
+
+
+def suite(runs, selected=None):
+    # Yield (name, measures) of every scenario whose name contains one of `selected`
+    for name, setup, draw in scenarios():
+        if selected and not any(word in name for word in selected):
+            continue
+        yield name, run_scenario(setup, draw, runs)
+
+
+def regressions(results, baseline, threshold):
+    # Yield (scenario, measure, baseline value, value) of what grew beyond the threshold
+    for name, measures in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for measure, slack in SLACK.items():
+            if measure in reference and measures[measure] > reference[measure] * (1 + threshold) + slack:
+                yield name, measure, reference[measure], measures[measure]
+
+
+def run_suite(options):
+    print('{:<34} {:>9} {:>9} {:>9} {:>7} {:>9}'.format('', 'best ms', 'median ms', 'peak kB', 'nodes', 'bytes'))
+    results = {}
+    for name, measures in suite(options.runs, options.filter):
+        results[name] = measures
+        print('{:<34} {:>9.1f} {:>9.1f} {:>9.1f} {:>7} {:>9}'.format(
+            name, measures['wall_ms'], measures['median_ms'], measures['peak_kb'], measures['nodes'], measures['bytes']), flush=True)
+    if options.json:
+        with open(options.json, 'w') as stream:
+            json.dump(results, stream, indent=1, sort_keys=True)
+    if not options.baseline:
+        return 0
+    with open(options.baseline) as stream:
+        baseline = json.load(stream)
+    failed = list(regressions(results, baseline, options.threshold))
+    for name, measure, before, after in failed:
+        print('REGRESSION {}: {} {:g} -> {:g}'.format(name, measure, before, after))
+    return 1 if failed else 0
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Interpreter start to first output time of every Synth Panels Designer part')
+    parser.add_argument('--part', type=int, action='append', choices=sorted(PARTS), help='Part to measure (default all)')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per part, after one warm-up run')
+    parser.add_argument('--suite', action='store_true', help='Measure the drawing of every scenario in this process')
+    parser.add_argument('--filter', action='append', help='Only the suite scenarios whose name contains this')
+    parser.add_argument('--json', help='Write the suite measures to this file')
+    parser.add_argument('--baseline', help='Suite measures to compare with, exit 1 on a regression')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed growth over the baseline (default 0.25)')
+    options = parser.parse_args(args)
+
+    if options.suite:
+        sys.exit(run_suite(options))
+
+    print('{:<16} {:>9} {:>9} {:>9} {:>9}'.format('', 'min ms', 'median ms', 'max ms', 'exit ms'))
+    for name, times in benchmark(options.part or sorted(PARTS), options.runs):
+        first = [t[0] * 1000 for t in times]
+        print('{:<16} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}'.format(
+            name, min(first), statistics.median(first), max(first), statistics.median(t[1] * 1000 for t in times)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Bill of materials export
+
+Every knob, jack, slider, panel and screw drawn by Synth Panels Designer
+carries its purchase data on its layer (data-spd-* attributes). This script
+streams one or more panels and writes the parts list as CSV, JSON or JSON lines,
+without looking at the geometry.
+
+    python spd_bom.py --format csv panel_a.svg panel_b.svg > bom.csv
+'''
+
+import argparse
+import csv
+import json
+import sys
+
+from lxml import etree
+
+COMPONENT_ATTR = 'data-spd-component'
+BOM_FIELDS = ['component', 'size', 'spec', 'quantity', 'names']
+PANEL_BOM_FIELDS = ['panel'] + BOM_FIELDS
+
+
+def read_components(path):
+    # Yield (component, name, size, spec, quantity) for every tagged layer, element by element
+    for event, elem in etree.iterparse(path, events=('start', 'end'), huge_tree=True):
+        if event == 'start':
+            component = elem.get(COMPONENT_ATTR)
+            if component is not None:
+                yield (
+                    component,
+                    elem.get('data-spd-name') or '',
+                    elem.get('data-spd-size') or '',
+                    elem.get('data-spd-spec') or '',
+                    int(elem.get('data-spd-quantity', '1')),
+                )
+        else:
+            # drop what we already read, memory stays flat on big files
+            elem.clear(keep_tail=True)
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+
+def aggregate(records):
+    # Group the records by (component, size, spec), keep the first-seen order
+    rows = {}
+    for component, name, size, spec, quantity in records:
+        row = rows.get((component, size, spec))
+        if row is None:
+            row = rows[(component, size, spec)] = {
+                'component': component, 'size': size, 'spec': spec, 'quantity': 0, 'names': []}
+        row['quantity'] += quantity
+        if name and name not in row['names']:
+            row['names'].append(name)
+    return list(rows.values())
+
+
+class BomWriter:
+
+    def __init__(self, stream, format, fields):
+        self.stream = stream
+        self.format = format
+        self.fields = fields
+        self.count = 0
+        if format == 'csv':
+            self.csv = csv.DictWriter(stream, fieldnames=fields, lineterminator='\n')
+            self.csv.writeheader()
+        elif format == 'json':
+            stream.write('[')
+
+    def write(self, row):
+        if self.format == 'csv':
+            self.csv.writerow(dict(row, names=' '.join(row['names'])))
+        elif self.format == 'json':
+            self.stream.write((',\n ' if self.count else '\n ') + json.dumps(row))
+        else:
+            self.stream.write(json.dumps(row) + '\n')
+        self.count += 1
+
+    def close(self):
+        if self.format == 'json':
+            self.stream.write('\n]\n' if self.count else ']\n')
+        self.stream.flush()
+
+
+def write_bom(paths, stream, format='csv', per_panel=False):
+    if per_panel:
+        # one block per file, written as soon as the file is read
+        writer = BomWriter(stream, format, PANEL_BOM_FIELDS)
+        for path in paths:
+            for row in aggregate(read_components(path)):
+                row = dict(row, panel=path)
+                writer.write(row)
+    else:
+        writer = BomWriter(stream, format, BOM_FIELDS)
+        records = (record for path in paths for record in read_components(path))
+        for row in aggregate(records):
+            writer.write(row)
+    writer.close()
+    return writer.count
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Bill of materials for Synth Panels Designer panels')
+    parser.add_argument('panels', nargs='+', help='SVG files drawn with Synth Panels Designer')
+    parser.add_argument('--format', choices=('csv', 'json', 'jsonl'), default='csv', help='Output format')
+    parser.add_argument('--per-panel', action='store_true', help='One list per panel instead of a batch total')
+    parser.add_argument('--output', help='Output file (default is stdout)')
+    options = parser.parse_args(args)
+
+    if options.output:
+        with open(options.output, 'w', newline='') as stream:
+            write_bom(options.panels, stream, options.format, options.per_panel)
+    else:
+        write_bom(options.panels, sys.stdout, options.format, options.per_panel)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+On-disk cache
+
+Inkscape starts the extension in a new process for every run, so what is
+worth keeping between runs goes to disk: one file per entry under the user
+cache directory (SPD_CACHE_DIR, or $XDG_CACHE_HOME/synthpanelsdesigner).
+Reads refresh the file time and the oldest entries are evicted when a cache
+grows over its size bound. A cache that can't be written is silently skipped.
+'''
+
+import hashlib
+import json
+import os
+import tempfile
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def cache_dir(name):
+    base = os.environ.get('SPD_CACHE_DIR')
+    if not base:
+        base = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                            'synthpanelsdesigner')
+    return os.path.join(base, name)
+
+
+def source_stamp():
+    # mtimes of the extension files, what they drew before a change is out of date
+    directory = os.path.dirname(os.path.abspath(__file__))
+    stamps = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(('.py', '.inx')):
+            try:
+                stamps.append((name, os.stat(os.path.join(directory, name)).st_mtime_ns))
+            except OSError:
+                continue
+    return stamps
+
+
+def cache_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    # Size-bounded least recently used cache of bytes, keyed by cache_key()
+
+    def __init__(self, name, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = cache_dir(name)
+        self.max_bytes = max_bytes
+        self.size = None  # bytes on disk, counted on the first write
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as stream:
+                data = stream.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def set(self, key, data):
+        path = self.path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(handle, 'wb') as stream:
+                stream.write(data)
+            os.replace(temporary, path)
+        except OSError:
+            return
+        if self.size is None:
+            self.size = sum(size for _, size, _ in self.entries())
+        else:
+            self.size += len(data)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def get_json(self, key):
+        data = self.get(key)
+        return None if data is None else json.loads(data.decode('utf-8'))
+
+    def set_json(self, key, value):
+        self.set(key, json.dumps(value, separators=(',', ':')).encode('utf-8'))
+
+    def entries(self):
+        # (mtime, size, path) of every entry
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def evict(self):
+        # drop the least recently used entries down to 90% of the bound
+        entries = sorted(self.entries())
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.size <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
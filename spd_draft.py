@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Draft memo
+
+With --draft=true (the live preview checkbox of the dialog) the extension
+draws a lighter document, and what it wrote is kept on disk for the
+document and the parameters it was drawn from. Going back to a value the
+preview already showed is answered from there, before inkex is imported.
+Entries are dropped when the extension files, the font or the calibration
+files change.
+'''
+
+import hashlib
+import os
+import sys
+
+from spd_cache import DiskCache, cache_key, source_stamp
+
+DRAFT = ('--draft=true', '--draft=True')
+# parameters naming files the drawing reads
+FILES = ('globalfont', 'knob_scale_calibration_file', 'slider_scale_calibration_file')
+
+_disk = DiskCache('draft', 32 * 1024 * 1024)
+
+
+def _split(args):
+    # (document path, --output, the other arguments) of an extension command line
+    document = output = None
+    rest = []
+    for arg in args:
+        if not arg.startswith('--'):
+            document = arg
+        elif arg.startswith('--output='):
+            output = arg[len('--output='):]
+        else:
+            rest.append(arg)
+    return document, output, rest
+
+
+def file_stamps(args):
+    # (parameter, modification time) of the files the arguments name
+    stamps = []
+    for arg in args:
+        name, _, value = arg[2:].partition('=')
+        if name.replace('-', '_') in FILES and value and os.path.isfile(value):
+            stamps.append((name, os.stat(value).st_mtime_ns))
+    return stamps
+
+
+def memo_key(args):
+    # Key of a draft run on a document file, None for any other run
+    if not any(arg in DRAFT for arg in args):
+        return None
+    document, _, rest = _split(args)
+    if document is None:
+        return None
+    try:
+        with open(document, 'rb') as stream:
+            digest = hashlib.sha256(stream.read()).hexdigest()
+    except OSError:
+        return None
+    return cache_key('draft', source_stamp(), digest, rest, file_stamps(rest))
+
+
+def replay(args):
+    # Write the remembered output of the same draft run, False when there's none
+    key = memo_key(args)
+    data = None if key is None else _disk.get(key)
+    if data is None:
+        return False
+    output = _split(args)[1]
+    if output:
+        with open(output, 'wb') as stream:
+            stream.write(data)
+    else:
+        sys.stdout.buffer.write(data)
+        sys.stdout.flush()
+    return True
+
+
+def remember(args, data):
+    # Keep what a draft run wrote
+    key = memo_key(args)
+    if key is not None:
+        _disk.set(key, data)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Production export
+
+Splits every panel into the files production needs, using the layers
+Synth Panels Designer creates:
+
+    art    printed artwork (everything but utilities, holes and component previews)
+    drill  drill plan (mounting holes, hole centers, knob/slider/jack drill guides)
+    pcb    PCB component plan
+    cut    laser/CNC cut (panel outline and mounting holes)
+
+Each panel is parsed once, the layer sets are written concurrently, and a
+batch of panels is spread over a process pool:
+
+    python spd_export.py --output-dir production --jobs 8 *.svg
+
+With --optimize-path the cut and drill files are flattened into one layer
+ordered as a short machine tour (see spd_toolpath.py) and the estimated
+travel saved is reported.
+'''
+
+import argparse
+import copy
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from lxml import etree
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+INKSCAPE_NS = 'http://www.inkscape.org/namespaces/inkscape'
+SODIPODI_NS = 'http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd'
+
+DRILL_LAYERS = (
+    'panel-holes',
+    'panel-drilling',
+    'knob-scales-utilities-drilling',
+    'slider-scales-utilities-drilling',
+    'jacks-utilities-drilling',
+)
+PCB_LAYERS = (
+    'knob-scales-utilities-pcb',
+    'slider-scales-utilities-pcb',
+    'jacks-utilities-pcb',
+)
+CUT_LAYERS = (
+    'panel',
+    'panel-holes',
+)
+# not printed: production guides and the previews of the real components
+NOT_ART_LAYERS = (
+    'panel-holes',
+    'panel-drilling',
+    'panel-screws',
+    'knob-scales-utilities',
+    'slider-scales-utilities',
+    'jacks-utilities',
+    'knobs-group',
+    'sliders-group',
+    'jacks-group',
+)
+
+# layer set: (keep only these ids, or drop these ids)
+LAYER_SETS = {
+    'art': (None, NOT_ART_LAYERS),
+    'drill': (DRILL_LAYERS, None),
+    'pcb': (PCB_LAYERS, None),
+    'cut': (CUT_LAYERS, None),
+}
+
+# reordered by --optimize-path
+TOOLPATH_SETS = ('drill', 'cut')
+
+# always copied, whatever the layer set
+DOCUMENT_TAGS = (
+    '{%s}defs' % SVG_NS,
+    '{%s}namedview' % SODIPODI_NS,
+    '{%s}metadata' % SVG_NS,
+)
+
+
+def show(elem):
+    # production files must not inherit a layer hidden while working in Inkscape
+    style = elem.get('style')
+    if style and 'display' in style:
+        declarations = [d for d in style.split(';') if d.strip() and not d.strip().startswith('display')]
+        if declarations:
+            elem.set('style', ';'.join(declarations))
+        else:
+            del elem.attrib['style']
+
+
+def shallow_copy(elem):
+    new = etree.Element(elem.tag, attrib=dict(elem.attrib), nsmap=elem.nsmap)
+    new.text = elem.text
+    return new
+
+
+def keep_layers(root, ids):
+    # New document with only the given layers, their ancestor groups keep their transforms
+    ids = set(ids)
+    new_root = shallow_copy(root)
+    for child in root:
+        if child.tag in DOCUMENT_TAGS:
+            new_root.append(copy.deepcopy(child))
+
+    copies = {root: new_root}
+    for elem in root.iter():
+        if elem.get('id') not in ids:
+            continue
+        if any(ancestor in copies and ancestor is not root and ancestor.get('id') in ids for ancestor in elem.iterancestors()):
+            continue  # already copied with a kept ancestor
+
+        chain = []
+        parent = elem.getparent()
+        while parent not in copies:
+            chain.append(parent)
+            parent = parent.getparent()
+        target = copies[parent]
+        for ancestor in reversed(chain):
+            copies[ancestor] = shallow_copy(ancestor)
+            show(copies[ancestor])
+            target.append(copies[ancestor])
+            target = copies[ancestor]
+
+        kept = copy.deepcopy(elem)
+        kept.tail = None
+        show(kept)
+        target.append(kept)
+        copies[elem] = kept
+    return new_root
+
+
+def drop_layers(root, ids):
+    # Copy of the document without the given layers
+    new_root = copy.deepcopy(root)
+    ids = set(ids)
+    for elem in [e for e in new_root.iter() if e.get('id') in ids]:
+        parent = elem.getparent()
+        if parent is not None:
+            parent.remove(elem)
+    return new_root
+
+
+def split_layers(root, sets=None):
+    # {set name: new document root}
+    documents = {}
+    for name in sets or LAYER_SETS:
+        keep, drop = LAYER_SETS[name]
+        if keep is not None:
+            documents[name] = keep_layers(root, keep)
+        else:
+            documents[name] = drop_layers(root, drop)
+    return documents
+
+
+def output_path(path, output_dir, name):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir or os.path.dirname(path), '{}-{}.svg'.format(stem, name))
+
+
+def write_document(root, path):
+    etree.ElementTree(root).write(path, xml_declaration=True, encoding='UTF-8')
+    return path
+
+
+def optimize_layer_set(document, path):
+    # Reorder a drill or cut file, returns its travel report line
+    from spd_toolpath import optimize_document
+    count, before, after = optimize_document(document)
+    saved = 100.0 * (before - after) / before if before else 0.0
+    return '{}: {} shapes, travel {:.1f} -> {:.1f} ({:.1f}% saved)'.format(path, count, before, after, saved)
+
+
+def export_layer_set(document, path, optimize=False):
+    report = optimize_layer_set(document, path) if optimize else None
+    write_document(document, path)
+    return path, report
+
+
+def export_panel(path, output_dir=None, sets=None, optimize=False, threads=None):
+    # Parse the panel once and write every layer set on its own thread
+    root = etree.parse(path, etree.XMLParser(huge_tree=True)).getroot()
+    documents = split_layers(root, sets)
+    with ThreadPoolExecutor(max_workers=threads or len(documents)) as pool:
+        futures = [
+            pool.submit(export_layer_set, document, output_path(path, output_dir, name), optimize and name in TOOLPATH_SETS)
+            for name, document in documents.items()
+        ]
+        return [future.result() for future in futures]
+
+
+def export_panels(paths, output_dir=None, sets=None, optimize=False, jobs=None):
+    # One process per panel, so a whole system scales with the number of cores
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    if len(paths) == 1 or jobs == 1:
+        return [export_panel(path, output_dir, sets, optimize) for path in paths]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(export_panel, path, output_dir, sets, optimize) for path in paths]
+        return [future.result() for future in futures]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Production files (art, drill, PCB, cut) for Synth Panels Designer panels')
+    parser.add_argument('panels', nargs='+', help='SVG files drawn with Synth Panels Designer')
+    parser.add_argument('--output-dir', help='Where to write the files (default: next to each panel)')
+    parser.add_argument('--sets', default=','.join(LAYER_SETS), help='Comma separated layer sets: ' + ', '.join(LAYER_SETS))
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: one per core)')
+    parser.add_argument('--optimize-path', action='store_true', help='Order the cut and drill files as a short machine tour')
+    options = parser.parse_args(args)
+
+    sets = [name.strip() for name in options.sets.split(',') if name.strip()]
+    unknown = [name for name in sets if name not in LAYER_SETS]
+    if unknown:
+        parser.error('unknown layer set: ' + ', '.join(unknown))
+
+    for written in export_panels(options.panels, options.output_dir, sets, options.optimize_path, options.jobs):
+        for path, report in written:
+            sys.stdout.write(path + '\n')
+            if report:
+                sys.stderr.write(report + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Streaming drill and placement extraction
+
+Reads the drill, PCB and centering layers of a (possibly huge) system file
+with lxml iterparse: transforms are resolved on the way down, every hole or
+guide is written as soon as it is closed and then dropped from memory, so the
+memory stays flat whatever the size of the embedded artwork.
+
+    python spd_extract.py system.svg > drill.csv
+
+Coordinates are in document user units (mm for documents made with Synth
+Panels Designer).
+'''
+
+import argparse
+import csv
+import math
+import re
+import sys
+
+from lxml import etree
+
+from spd_export import DRILL_LAYERS, PCB_LAYERS
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+INKSCAPE_NS = 'http://www.inkscape.org/namespaces/inkscape'
+SODIPODI_NS = 'http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd'
+
+CENTERING_LAYERS = (
+    'knob-scales-utilities-centering',
+    'jacks-utilities-centering',
+)
+SPD_LAYERS = DRILL_LAYERS + PCB_LAYERS + CENTERING_LAYERS
+
+SHAPES = {'{%s}%s' % (SVG_NS, tag): tag for tag in ('circle', 'ellipse', 'rect', 'path', 'line')}
+LABEL = '{%s}label' % INKSCAPE_NS
+GROUPMODE = '{%s}groupmode' % INKSCAPE_NS
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+TRANSFORM_RE = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+PATH_RE = re.compile(r'([MmLlHhVvCcSsQqTtAaZz])([^MmLlHhVvCcSsQqTtAaZz]*)')
+# number of values per command, for path bounding boxes
+PATH_ARGS = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7, 'Z': 0}
+
+FIELDS = ['layer', 'name', 'shape', 'x', 'y', 'width', 'height']
+
+
+def multiply(a, b):
+    # a * b, as (a, b, c, d, e, f) svg matrices
+    return (
+        a[0] * b[0] + a[2] * b[1],
+        a[1] * b[0] + a[3] * b[1],
+        a[0] * b[2] + a[2] * b[3],
+        a[1] * b[2] + a[3] * b[3],
+        a[0] * b[4] + a[2] * b[5] + a[4],
+        a[1] * b[4] + a[3] * b[5] + a[5],
+    )
+
+
+def parse_transform(value):
+    matrix = IDENTITY
+    if not value:
+        return matrix
+    for name, args in TRANSFORM_RE.findall(value):
+        v = [float(n) for n in NUMBER_RE.findall(args)]
+        if name == 'matrix' and len(v) == 6:
+            step = tuple(v)
+        elif name == 'translate':
+            step = (1.0, 0.0, 0.0, 1.0, v[0], v[1] if len(v) > 1 else 0.0)
+        elif name == 'scale':
+            step = (v[0], 0.0, 0.0, v[1] if len(v) > 1 else v[0], 0.0, 0.0)
+        elif name == 'rotate':
+            a = math.radians(v[0])
+            step = (math.cos(a), math.sin(a), -math.sin(a), math.cos(a), 0.0, 0.0)
+            if len(v) == 3:
+                step = multiply(multiply((1.0, 0.0, 0.0, 1.0, v[1], v[2]), step), (1.0, 0.0, 0.0, 1.0, -v[1], -v[2]))
+        elif name == 'skewX':
+            step = (1.0, 0.0, math.tan(math.radians(v[0])), 1.0, 0.0, 0.0)
+        elif name == 'skewY':
+            step = (1.0, math.tan(math.radians(v[0])), 0.0, 1.0, 0.0, 0.0)
+        else:
+            continue
+        matrix = multiply(matrix, step)
+    return matrix
+
+
+def apply(matrix, x, y):
+    return (matrix[0] * x + matrix[2] * y + matrix[4], matrix[1] * x + matrix[3] * y + matrix[5])
+
+
+def path_bbox(d):
+    # Bounding box of the path end points (the guides are made of lines)
+    xs, ys = [], []
+    x = y = start_x = start_y = 0.0
+    for command, args in PATH_RE.findall(d):
+        upper = command.upper()
+        values = [float(n) for n in NUMBER_RE.findall(args)]
+        count = PATH_ARGS[upper]
+        if count == 0:
+            x, y = start_x, start_y
+            continue
+        relative = command != upper
+        for i in range(0, len(values) - count + 1, count):
+            chunk = values[i:i + count]
+            if upper == 'H':
+                x = chunk[0] + (x if relative else 0)
+            elif upper == 'V':
+                y = chunk[0] + (y if relative else 0)
+            else:
+                x, y = (chunk[-2] + x, chunk[-1] + y) if relative else (chunk[-2], chunk[-1])
+            if upper == 'M' and i == 0:
+                start_x, start_y = x, y
+            xs.append(x)
+            ys.append(y)
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def shape_box(elem, tag):
+    # (center x, center y, width, height) in the element's own coordinates
+    get = lambda name, default=0.0: float(elem.get(name, default) or default)
+    if elem.get('{%s}cx' % SODIPODI_NS) is not None:
+        # arcs and stars keep their center
+        rx = float(elem.get('{%s}rx' % SODIPODI_NS, elem.get('{%s}r1' % SODIPODI_NS, 0)))
+        ry = float(elem.get('{%s}ry' % SODIPODI_NS, rx))
+        return float(elem.get('{%s}cx' % SODIPODI_NS)), float(elem.get('{%s}cy' % SODIPODI_NS)), 2 * rx, 2 * ry
+    if tag == 'circle':
+        return get('cx'), get('cy'), 2 * get('r'), 2 * get('r')
+    if tag == 'ellipse':
+        return get('cx'), get('cy'), 2 * get('rx'), 2 * get('ry')
+    if tag == 'rect':
+        w, h = get('width'), get('height')
+        return get('x') + w / 2, get('y') + h / 2, w, h
+    if tag == 'line':
+        x1, y1, x2, y2 = get('x1'), get('y1'), get('x2'), get('y2')
+        return (x1 + x2) / 2, (y1 + y2) / 2, abs(x2 - x1), abs(y2 - y1)
+    box = path_bbox(elem.get('d', ''))
+    if box is None:
+        return None
+    return (box[0] + box[2]) / 2, (box[1] + box[3]) / 2, box[2] - box[0], box[3] - box[1]
+
+
+def placed_box(matrix, box):
+    # the transformed center, sizes scaled by the transform
+    x, y = apply(matrix, box[0], box[1])
+    sx = math.hypot(matrix[0], matrix[1])
+    sy = math.hypot(matrix[2], matrix[3])
+    return x, y, box[2] * sx, box[3] * sy
+
+
+def extract(source, layers=SPD_LAYERS):
+    # Yield a dict per hole/guide found in the given layers, streaming the document
+    layers = set(layers)
+    # one entry per open element: (matrix, spd layer id, component name)
+    stack = [(IDENTITY, None, None)]
+    for event, elem in etree.iterparse(source, events=('start', 'end'), huge_tree=True):
+        if event == 'start':
+            matrix, layer, name = stack[-1]
+            transform = elem.get('transform')
+            if transform:
+                matrix = multiply(matrix, parse_transform(transform))
+            elem_id = elem.get('id')
+            if elem_id in layers:
+                layer, name = elem_id, None
+            elif layer is not None and name is None and elem.get(GROUPMODE) == 'layer':
+                # the first layer under an utilities layer has the name of the component
+                name = elem.get(LABEL)
+            stack.append((matrix, layer, name))
+            continue
+
+        matrix, layer, name = stack.pop()
+        tag = SHAPES.get(elem.tag)
+        if layer is not None and tag is not None:
+            box = shape_box(elem, tag)
+            if box is not None:
+                x, y, width, height = placed_box(matrix, box)
+                yield {
+                    'layer': layer,
+                    'name': name or elem.get(LABEL) or '',
+                    'shape': tag,
+                    'x': x, 'y': y, 'width': width, 'height': height,
+                }
+
+        elem.clear(keep_tail=True)
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Stream drill and placement coordinates out of Synth Panels Designer files')
+    parser.add_argument('documents', nargs='+', help='SVG files, any size')
+    parser.add_argument('--layers', default=','.join(SPD_LAYERS), help='Comma separated layer ids')
+    parser.add_argument('--precision', type=int, default=3, help='Decimals in the output')
+    options = parser.parse_args(args)
+
+    layers = [layer.strip() for layer in options.layers.split(',') if layer.strip()]
+    writer = csv.writer(sys.stdout, lineterminator='\n')
+    writer.writerow(['document'] + FIELDS)
+    for document in options.documents:
+        for hit in extract(document, layers):
+            writer.writerow([document, hit['layer'], hit['name'], hit['shape']] +
+                            [round(hit[field], options.precision) for field in ('x', 'y', 'width', 'height')])
+
+
+if __name__ == '__main__':
+    main()
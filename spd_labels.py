@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Label collision pass
+
+Dense scales on small knobs make their labels overlap. The extent of every
+label is estimated from font metrics (Helvetica advance widths, close enough
+for the sans fonts panels use), the labels are placed by priority (endpoints,
+then accented ticks, then the rest) and each one is checked against the
+already placed ones in a spatial hash, so a scale of n labels costs O(n).
+A colliding label is moved to its next candidate position, or dropped.
+'''
+
+# advance widths in em, from the Helvetica AFM
+WIDTHS = {
+    '0': 0.556, '1': 0.556, '2': 0.556, '3': 0.556, '4': 0.556,
+    '5': 0.556, '6': 0.556, '7': 0.556, '8': 0.556, '9': 0.556,
+    '+': 0.584, '-': 0.333, '.': 0.278, ',': 0.278, ' ': 0.278, '%': 0.889,
+    'k': 0.5, 'i': 0.222, 'l': 0.222, 'j': 0.222, 'f': 0.278, 't': 0.278, 'r': 0.333,
+    'm': 0.833, 'w': 0.722, 'M': 0.833, 'W': 0.944, 'H': 0.722, 'z': 0.5, 'B': 0.667, 'd': 0.556,
+}
+DEFAULT_WIDTH = 0.556
+CAP_HEIGHT = 0.718
+DESCENT = 0.207
+DESCENDERS = set('gjpqy,')
+
+# placement priorities
+ENDPOINT = 2
+ACCENT = 1
+REGULAR = 0
+
+
+def text_width(text, size):
+    return size * sum(WIDTHS.get(char, DEFAULT_WIDTH) for char in text)
+
+
+def label_box(x, y, text, size, anchor='middle', padding=0.0):
+    # (left, top, right, bottom) of a text drawn with its baseline at y
+    width = text_width(text, size)
+    if anchor == 'middle':
+        left = x - width / 2
+    elif anchor == 'end':
+        left = x - width
+    else:
+        left = x
+    bottom = y + (DESCENT * size if DESCENDERS.intersection(text) else 0.0)
+    return (left - padding, y - CAP_HEIGHT * size - padding, left + width + padding, bottom + padding)
+
+
+def tick_priority(tick, n_ticks, accent=0):
+    if tick == 0 or tick == n_ticks - 1:
+        return ENDPOINT
+    if accent and tick % accent == 0:
+        return ACCENT
+    return REGULAR
+
+
+def overlap(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class SpatialHash:
+    # Boxes bucketed in square cells, a box is stored in every cell it touches
+
+    def __init__(self, cell):
+        self.cell = max(cell, 1e-9)
+        self.cells = {}
+
+    def keys(self, box):
+        x0, y0 = int(box[0] // self.cell), int(box[1] // self.cell)
+        x1, y1 = int(box[2] // self.cell), int(box[3] // self.cell)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                yield (x, y)
+
+    def collides(self, box):
+        return any(overlap(box, other) for key in self.keys(box) for other in self.cells.get(key, ()))
+
+    def insert(self, box):
+        for key in self.keys(box):
+            self.cells.setdefault(key, []).append(box)
+
+
+def place_labels(candidates, priorities, obstacles=()):
+    # candidates: per label, the boxes it may take, preferred first.
+    # Returns per label the index of the chosen box, or None when it is dropped.
+    sizes = [max(box[2] - box[0], box[3] - box[1]) for boxes in candidates for box in boxes[:1]]
+    index = SpatialHash(max(sizes) if sizes else 1.0)
+    for box in obstacles:
+        index.insert(box)
+    chosen = [None] * len(candidates)
+    for label in sorted(range(len(candidates)), key=lambda i: (-priorities[i], i)):
+        for option, box in enumerate(candidates[label]):
+            if not index.collides(box):
+                index.insert(box)
+                chosen[label] = option
+                break
+    return chosen
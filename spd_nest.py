@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Sheet nesting
+
+Places many panels (drawn with part 1, so axis aligned rectangles) on laser
+or CNC stock sheets with a skyline bottom-left packer, kerf spacing and
+optional 90 degree rotation. Every panel is stored once in <defs> and placed
+with <use>, the material utilization is reported.
+
+    python spd_nest.py --sheet 600x400 --kerf 0.2 vco.svg:4 vcf.svg:8 lfo.svg:8
+'''
+
+import argparse
+import copy
+import os
+import re
+import sys
+
+from lxml import etree
+
+from spd_export import CUT_LAYERS, DOCUMENT_TAGS, INKSCAPE_NS, SODIPODI_NS, SVG_NS, keep_layers
+
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+NSMAP = {None: SVG_NS, 'xlink': XLINK_NS, 'inkscape': INKSCAPE_NS, 'sodipodi': SODIPODI_NS}
+
+# mm per unit
+UNITS = {'mm': 1.0, 'cm': 10.0, 'in': 25.4, 'pt': 25.4 / 72, 'pc': 25.4 / 6, 'px': 25.4 / 96, '': 25.4 / 96}
+LENGTH_RE = re.compile(r'^\s*([-+]?[\d.]+(?:[eE][-+]?\d+)?)\s*([a-z]*)\s*$')
+
+
+def length_mm(value):
+    match = LENGTH_RE.match(value or '')
+    if not match or match.group(2) not in UNITS:
+        raise ValueError('Unsupported length: {!r}'.format(value))
+    return float(match.group(1)) * UNITS[match.group(2)]
+
+
+class Panel:
+    __slots__ = ('path', 'root', 'width', 'height', 'scale')
+
+    def __init__(self, path, layers='cut'):
+        root = etree.parse(path, etree.XMLParser(huge_tree=True)).getroot()
+        self.path = path
+        self.width = length_mm(root.get('width'))
+        self.height = length_mm(root.get('height'))
+        viewbox = root.get('viewBox')
+        # user units to mm
+        self.scale = self.width / float(viewbox.replace(',', ' ').split()[2]) if viewbox else UNITS['px']
+        self.root = keep_layers(root, CUT_LAYERS) if layers == 'cut' else root
+
+
+class Skyline:
+    # Bottom-left skyline packer for one sheet
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.segments = [[0.0, 0.0, width]]  # x, y, width
+
+    def fit(self, index, width, height):
+        # y of the rectangle if placed at the start of segment `index`, or None
+        x = self.segments[index][0]
+        if x + width > self.width + 1e-9:
+            return None
+        y = 0.0
+        remaining = width
+        i = index
+        while remaining > 1e-9:
+            if i >= len(self.segments):
+                return None
+            y = max(y, self.segments[i][1])
+            if y + height > self.height + 1e-9:
+                return None
+            remaining -= self.segments[i][2]
+            i += 1
+        return y
+
+    def find(self, width, height):
+        # (top, x, index) of the lowest then leftmost position
+        best = None
+        for index in range(len(self.segments)):
+            y = self.fit(index, width, height)
+            if y is not None and (best is None or (y + height, self.segments[index][0]) < best[:2]):
+                best = (y + height, self.segments[index][0], index, y)
+        return best
+
+    def place(self, index, x, y, width, height):
+        self.segments.insert(index, [x, y + height, width])
+        i = index + 1
+        # shrink or drop the segments now under the new one
+        while i < len(self.segments):
+            segment = self.segments[i]
+            end = x + width
+            if segment[0] >= end:
+                break
+            overlap = end - segment[0]
+            if overlap >= segment[2]:
+                del self.segments[i]
+            else:
+                segment[0] += overlap
+                segment[2] -= overlap
+                break
+        # merge neighbours at the same height
+        i = 0
+        while i < len(self.segments) - 1:
+            if abs(self.segments[i][1] - self.segments[i + 1][1]) < 1e-9:
+                self.segments[i][2] += self.segments[i + 1][2]
+                del self.segments[i + 1]
+            else:
+                i += 1
+
+    def insert(self, width, height, rotate):
+        # Place a rectangle, returns (x, y, rotated) or None when the sheet is full
+        best = self.find(width, height)
+        rotated = False
+        if rotate and width != height:
+            turned = self.find(height, width)
+            if turned is not None and (best is None or turned[:2] < best[:2]):
+                best, rotated = turned, True
+        if best is None:
+            return None
+        _, x, index, y = best
+        w, h = (height, width) if rotated else (width, height)
+        self.place(index, x, y, w, h)
+        return x, y, rotated
+
+
+def nest(sizes, sheet_width, sheet_height, kerf=0.0, margin=0.0, rotate=True):
+    # Pack (width, height) rectangles on as few sheets as needed.
+    # Returns one list of (item index, x, y, rotated) per sheet.
+    usable_w = sheet_width - 2 * margin + kerf
+    usable_h = sheet_height - 2 * margin + kerf
+    order = sorted(range(len(sizes)), key=lambda i: (-max(sizes[i]), -min(sizes[i])))
+    sheets, placements = [], []
+    for item in order:
+        width, height = sizes[item][0] + kerf, sizes[item][1] + kerf
+        for skyline, placed in zip(sheets, placements):
+            spot = skyline.insert(width, height, rotate)
+            if spot is not None:
+                break
+        else:
+            skyline = Skyline(usable_w, usable_h)
+            spot = skyline.insert(width, height, rotate)
+            if spot is None:
+                raise ValueError('Panel {:g} x {:g} mm does not fit on the sheet'.format(*sizes[item]))
+            sheets.append(skyline)
+            placements.append([])
+            placed = placements[-1]
+        placed.append((item, spot[0] + margin, spot[1] + margin, spot[2]))
+    return placements
+
+
+def prefix_ids(root, prefix):
+    # Make the ids of a panel unique in the sheet, references follow
+    ids = {elem.get('id') for elem in root.iter() if elem.get('id')}
+    href = '{%s}href' % XLINK_NS
+    for elem in root.iter():
+        if elem.get('id'):
+            elem.set('id', prefix + elem.get('id'))
+        link = elem.get(href) or elem.get('href')
+        if link and link.startswith('#') and link[1:] in ids:
+            elem.set(href if elem.get(href) else 'href', '#' + prefix + link[1:])
+        style = elem.get('style')
+        if style and 'url(#' in style:
+            elem.set('style', re.sub(r'url\(#([^)]+)\)', lambda m: 'url(#{}{})'.format(prefix, m.group(1)) if m.group(1) in ids else m.group(0), style))
+
+
+def sheet_document(panels, placed, sheet_width, sheet_height):
+    root = etree.Element('{%s}svg' % SVG_NS, nsmap=NSMAP)
+    root.set('width', '{:g}mm'.format(sheet_width))
+    root.set('height', '{:g}mm'.format(sheet_height))
+    root.set('viewBox', '0 0 {:g} {:g}'.format(sheet_width, sheet_height))
+    defs = etree.SubElement(root, '{%s}defs' % SVG_NS)
+    layer = etree.SubElement(root, '{%s}g' % SVG_NS)
+    layer.set('{%s}groupmode' % INKSCAPE_NS, 'layer')
+    layer.set('{%s}label' % INKSCAPE_NS, 'Sheet')
+
+    defined = {}
+    for item, x, y, rotated in placed:
+        panel = panels[item]
+        if panel.path not in defined:
+            ref = 'nest-panel-{}'.format(len(defined) + 1)
+            group = etree.SubElement(defs, '{%s}g' % SVG_NS)
+            group.set('id', ref)
+            group.set('{%s}label' % INKSCAPE_NS, os.path.basename(panel.path))
+            if panel.scale != 1.0:
+                group.set('transform', 'scale({:.10g})'.format(panel.scale))
+            content = copy.deepcopy(panel.root)
+            prefix_ids(content, ref + '-')
+            for child in content:
+                if child.tag == '{%s}defs' % SVG_NS:
+                    defs.extend(list(child))
+                elif child.tag not in DOCUMENT_TAGS:
+                    group.append(child)
+            defined[panel.path] = ref
+
+        use = etree.SubElement(layer, '{%s}use' % SVG_NS)
+        use.set('{%s}href' % XLINK_NS, '#' + defined[panel.path])
+        if rotated:
+            # turn the panel a quarter and put its new top-left corner at (x, y)
+            use.set('transform', 'translate({:.10g},{:.10g}) rotate(90)'.format(x + panel.height, y))
+        else:
+            use.set('transform', 'translate({:.10g},{:.10g})'.format(x, y))
+        use.set('{%s}label' % INKSCAPE_NS, os.path.basename(panel.path))
+    return root
+
+
+def utilization(panels, placements, sheet_width, sheet_height):
+    used = sum(panels[item].width * panels[item].height for placed in placements for item, _, _, _ in placed)
+    return used / (len(placements) * sheet_width * sheet_height) if placements else 0.0
+
+
+def parse_sheet(value):
+    width, height = value.lower().split('x')
+    return float(width), float(height)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Nest Synth Panels Designer panels on stock sheets')
+    parser.add_argument('panels', nargs='+', help='Panel SVG files, optionally with a count: panel.svg:4')
+    parser.add_argument('--sheet', type=parse_sheet, default=(600.0, 400.0), help='Sheet size in mm, WIDTHxHEIGHT')
+    parser.add_argument('--kerf', type=float, default=0.2, help='Space between panels in mm')
+    parser.add_argument('--margin', type=float, default=0.0, help='Unused border of the sheet in mm')
+    parser.add_argument('--no-rotate', action='store_true', help='Keep every panel upright')
+    parser.add_argument('--layers', choices=('cut', 'all'), default='cut', help='Panel content placed on the sheet')
+    parser.add_argument('--output', default='sheet.svg', help='Output file, sheets after the first get -2, -3...')
+    options = parser.parse_args(args)
+
+    loaded = {}
+    panels = []
+    for spec in options.panels:
+        path, _, count = spec.rpartition(':') if re.search(r':\d+$', spec) else (spec, '', '1')
+        if path not in loaded:
+            loaded[path] = Panel(path, options.layers)
+        panels.extend([loaded[path]] * int(count))
+
+    sheet_width, sheet_height = options.sheet
+    placements = nest([(p.width, p.height) for p in panels], sheet_width, sheet_height,
+                      options.kerf, options.margin, not options.no_rotate)
+
+    stem, ext = os.path.splitext(options.output)
+    if os.path.dirname(options.output):
+        os.makedirs(os.path.dirname(options.output), exist_ok=True)
+    for number, placed in enumerate(placements, start=1):
+        path = options.output if number == 1 else '{}-{}{}'.format(stem, number, ext or '.svg')
+        document = sheet_document(panels, placed, sheet_width, sheet_height)
+        etree.ElementTree(document).write(path, xml_declaration=True, encoding='UTF-8')
+        sys.stdout.write(path + '\n')
+    sys.stderr.write('{} panels on {} sheet(s) of {:g} x {:g} mm, utilization {:.1f}%\n'.format(
+        len(panels), len(placements), sheet_width, sheet_height,
+        100 * utilization(panels, placements, sheet_width, sheet_height)))
+
+
+if __name__ == '__main__':
+    main()
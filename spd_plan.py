@@ -0,0 +1,633 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Design plans
+
+The panel, the knob and slider scales and the jacks are drawn in two steps.
+Planning turns the options and the geometry of the selection into compact
+records (ticks, labels, holes, guides, arcs) without building any DOM; the
+extension then emits the records as SVG. A plan is plain data: --dry_run
+prints it as JSON so designs can be checked, diffed and cached without
+Inkscape, and other emitters (DXF, Gerber) can draw the same records.
+
+Every record names the layer it is drawn in, plan.styles holds the SVG style
+of each layer.
+'''
+
+import json
+from math import cos, pi, sin
+
+from spd_labels import label_box, place_labels, tick_priority
+from spd_taper import format_value
+
+# panel width and height in mm, per option value
+MOOG_WIDTHS = {1: 53.721, 2: 107.696, 4: 215.646, 8: 431.546}
+FRACRACK_WIDTHS = {1: 38.1, 2: 76.3, 3: 114.3}
+HAMMOND_WIDTHS = {1: 51, 2: 39, 3: 60, 4: 66, 5: 92, 6: 99, 7: 108, 8: 114, 9: 118, 10: 119, 11: 145, 12: 170, 13: 131, 14: 190}
+HAMMOND_HEIGHTS = {1: 51, 2: 93, 3: 112, 4: 121, 5: 92, 6: 112, 7: 108, 8: 114, 9: 133, 10: 94, 11: 95, 12: 138, 13: 130, 14: 122}
+
+# jack hole radius and thickness, nut radius per nut type, in mm
+JACKS = {
+    1: (2.375, 1.25, {1: 4.0, 2: 4.0, 3: 4.5}),   # 3.5 mm
+    2: (3.85, 1.3, {1: 6.0, 2: 6.25, 3: 7.5}),    # 1/4 in
+}
+NUTS = {1: 'knurled nut', 2: 'hex nut (metal)', 3: 'hex nut (plastic)'}
+
+Orange = '#f6921e'
+Blue = '#0000FF'
+White = '#FFFFFF'
+Green = '#32a852'
+
+lasercut_width = '0.01mm'
+
+
+class Record:
+    __slots__ = ()
+
+    def __init__(self, *values, **named):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+        for name in self.__slots__[len(values):]:
+            setattr(self, name, named.get(name))
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(repr(getattr(self, name)) for name in self.__slots__))
+
+    def as_dict(self, decimals=None):
+        # Fields that are set, floats rounded to `decimals` places
+        values = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            if isinstance(value, float) and decimals is not None:
+                value = round(value, decimals) + 0.0
+            values[name] = value
+        return values
+
+    def moved(self, dx, dy):
+        # A copy shifted by (dx, dy)
+        values = {name: getattr(self, name) for name in self.__slots__}
+        for x, y in (('x', 'y'), ('x2', 'y2')):
+            if values.get(x) is not None:
+                values[x] += dx
+                values[y] += dy
+        return type(self)(**values)
+
+
+class Tick(Record):
+    # A scale mark: the line from (x, y) to (x2, y2) stroked `width` wide, or a dot of radius r on (x, y)
+    __slots__ = ('layer', 'x', 'y', 'x2', 'y2', 'r', 'width', 'name')
+
+
+class Label(Record):
+    # A text centred on x with its baseline at y, `tick` is the index of its main tick
+    __slots__ = ('layer', 'x', 'y', 'text', 'size', 'tick', 'name')
+
+
+class Hole(Record):
+    # A round hole of radius r on (x, y), or an oval one `length` long when length is set
+    __slots__ = ('layer', 'x', 'y', 'r', 'length', 'name')
+
+
+class Guide(Record):
+    # A construction mark centred on (x, y): 'cross' of size w, 'dot' or 'circle' of radius r.
+    # A 'line' goes from (x, y) by (w, h), a 'rect' spans w x h from its corner (x, y) with round corners r.
+    # `group` is the label of the group the mark is wrapped in.
+    __slots__ = ('layer', 'shape', 'x', 'y', 'w', 'h', 'r', 'name', 'group')
+
+
+class Arc(Record):
+    # An open arc of radius r around (x, y), from angle `start` to `end`
+    __slots__ = ('layer', 'x', 'y', 'r', 'start', 'end', 'name')
+
+
+class Plan:
+    __slots__ = ('part', 'name', 'size', 'styles', 'ticks', 'labels', 'holes', 'guides', 'arcs')
+
+    def __init__(self, part, name=None, size=None):
+        self.part = part
+        self.name = name
+        self.size = size
+        self.styles = {}
+        self.ticks = []
+        self.labels = []
+        self.holes = []
+        self.guides = []
+        self.arcs = []
+
+    def as_dict(self, decimals=None):
+        plan = {'part': self.part, 'name': self.name}
+        if self.size is not None:
+            plan['size'] = [round(value, decimals) if decimals is not None else value for value in self.size]
+        # colours are written as text
+        plan['styles'] = {layer: {key: value if isinstance(value, (str, int, float)) else str(value) for key, value in style.items()}
+                          for layer, style in self.styles.items()}
+        for kind in ('ticks', 'labels', 'holes', 'guides', 'arcs'):
+            plan[kind] = [record.as_dict(decimals) for record in getattr(self, kind)]
+        return plan
+
+    def moved(self, dx, dy, name=None):
+        # The same plan shifted by (dx, dy), for another knob or slider of the same scale
+        plan = Plan(self.part, self.name if name is None else name, self.size)
+        plan.styles = self.styles
+        for kind in ('ticks', 'labels', 'holes', 'guides', 'arcs'):
+            setattr(plan, kind, [record.moved(dx, dy) for record in getattr(self, kind)])
+        return plan
+
+    def to_json(self, decimals=None):
+        return json.dumps(self.as_dict(decimals), separators=(',', ':'))
+
+
+def polar(x, y, radius, angle):
+    return x + radius * cos(angle), y + radius * sin(angle)
+
+
+def stroke(color, width):
+    return {'fill': 'none', 'stroke': color, 'stroke-width': width}
+
+
+def filled(color):
+    return {'fill': color, 'stroke': 'none', 'stroke-width': 0}
+
+
+def label_style(color, size):
+    return {'text-anchor': 'middle', 'font-size': str(size), 'dominant-baseline': 'auto', 'fill': color}
+
+
+def line(layer, x1, y1, x2, y2, name=None):
+    return Guide(layer, 'line', x1, y1, x2 - x1, y2 - y1, name=name)
+
+
+def drill_guide(plan, layer, x, y, type, dimension, color, width):
+    # Drill mark of a round component: 2 cross, 3 dot, 4 circle
+    if type == 2:
+        plan.styles[layer] = stroke(color, width)
+        plan.guides.append(Guide(layer, 'cross', x, y, dimension, name='cross', group='Drilling mark'))
+    elif type == 3:
+        plan.styles[layer] = filled(color)
+        plan.guides.append(Guide(layer, 'dot', x, y, r=dimension / 2, group='Component mark'))
+    elif type == 4:
+        plan.styles[layer] = stroke(color, width)
+        plan.guides.append(Guide(layer, 'circle', x, y, r=dimension / 2 - width / 2, group='Component mark'))
+
+
+def pcb_guide(plan, layer, x, y, dimension, color, width):
+    plan.styles[layer] = stroke(color, width)
+    plan.guides.append(Guide(layer, 'cross', x, y, dimension, name='cross', group='PCB mark'))
+
+
+def panel_dimensions(options):
+    # (width, height) of the panel in mm
+    panel_type = options.panel_type
+    euro_width = 7.5 + (options.eurorack_panel_hp - 3) * 5.08 + 7.5
+    if panel_type == 'e3u':
+        # Eurorack 3U Doepfer standard, http://www.doepfer.de/a100_man/a100m_e.htm
+        return euro_width, 128.5
+    if panel_type == 'e1uij':
+        # Eurorack 1U Intellijel standard, https://intellijel.com/support/1u-technical-specifications/
+        return euro_width, 39.65
+    if panel_type == 'e1upl':
+        # Eurorack 1U Pulp Logic, http://pulplogic.com/1u_tiles/
+        return euro_width, 44.45
+    if panel_type == 'api':
+        # API500 500 module series, https://www.barryrudolph.com/recall/manuals/api_vpr_%20500_spec.pdf
+        return options.api_panel_units * 38.1, 133.35
+    if panel_type in ('m5u', 'd5u'):
+        # MOOG unit 5U, https://www.dsl-man.de/display/FRONTPANELS/5U+Format+specifications
+        return MOOG_WIDTHS[options.moog_panel_units], 222.25
+    if panel_type == 'nineteen':
+        # 19-inch standard, https://sdiy.info/w/index.php?title=19-inch_rack
+        return 482.60, options.nineteen_panel_units * 44.50
+    if panel_type in ('lw', 'serge', 'buchla'):
+        # Loudest Warning standard, http://www.loudestwarning.co.uk/portfolio/4u-modular-specs/
+        # 25.4 correspond to 1 inch, real panels are "few tenths of a mm less..."
+        return options.lw_panel_units * 25.4, 175
+    if panel_type == 'fracrack':
+        # Fracrack standard, https://www.paia.com/fracrak.asp
+        return FRACRACK_WIDTHS[options.fracrack_panel_units], 133.35
+    if panel_type == 'hammond':
+        # https://www.guitarpedalx.com/news/gpx-blog/the-key-pedal-enclosure-sizes-you-are-most-likely-to-encounter
+        return HAMMOND_WIDTHS[options.hammond_panel_units], HAMMOND_HEIGHTS[options.hammond_panel_units]
+    return options.panel_custom_width, options.panel_custom_height
+
+
+def mounting_holes(options, width, height):
+    # (top, bottom, left, right, radius) of the mounting holes in mm, all 0 without holes
+    panel_type = options.panel_type
+    euro_hp = options.eurorack_panel_hp
+    if panel_type in ('e3u', 'e1uij', 'e1upl'):
+        left = 4 if euro_hp <= 2 else 7.5
+        radius = 1.5857 if panel_type == 'e1upl' else 1.6
+        return 3.0, height - 3.0, left, ((euro_hp - 3.0) * 5.08) + 7.5, radius
+    if panel_type == 'api':
+        return 4.35, height - 4.35, 19.05, options.api_panel_units * 38.1 - 38.1 / 2, 1.6
+    if panel_type in ('m5u', 'd5u'):
+        return 4.445, height - 4.445, 26.86, options.moog_panel_units * 53.975 - 53.975 / 2, 2.159
+    if panel_type in ('lw', 'serge', 'buchla'):
+        return 3, height - 3, 12.7, options.lw_panel_units * 25.4 - 12.7, 1.6
+    if panel_type == 'fracrack':
+        if options.fracrack_panel_units == 2:  # 4 places
+            left, right = width / 2 - 19.05, width / 2 + 19.05
+        elif options.fracrack_panel_units == 3:  # 6 places
+            left, right = width / 2 - 38.1, width / 2 + 38.1
+        else:  # 2 places
+            left, right = width / 2, 0
+        return 3, height - 3, left, right, 1.524
+    if panel_type == 'nineteen':
+        units = options.nineteen_panel_units
+        return 6.35, 6.35 + units * (15.88 * 2) + units * 12.7 - 12.7, 7.928, 7.928 + 465.12, 2.18
+    return 0, 0, 0, 0, 0
+
+
+def plan_panel(options, unitfactor):
+    # Panel outline, mounting holes, screws and drilling centers
+    width, height = panel_dimensions(options)
+    panel_type = options.panel_type
+    plan = Plan(1, options.panel_name, (width * unitfactor, height * unitfactor))
+    if options.panel_lasercut:
+        plan.styles['panel'] = {'stroke': Blue, 'stroke-width': lasercut_width, 'fill': 'none'}
+    else:
+        plan.styles['panel'] = {'stroke': 'none', 'stroke-width': '0mm', 'fill': options.panel_color}
+
+    top, bottom, left, right, hole_radius = mounting_holes(options, width, height)
+    topH, bottomH = top * unitfactor, bottom * unitfactor
+    leftH, rightH = left * unitfactor, right * unitfactor
+    holeR = hole_radius * unitfactor
+    gap = holeR / 2
+    corners = ((leftH, bottomH, 'Bottom left'), (leftH, topH, 'Top left'),
+               (rightH, bottomH, 'Bottom right'), (rightH, topH, 'Top right'))
+
+    if options.panel_screws:
+        plan.styles['screws'] = {'transform': 'rotate(-10)', 'stroke': options.panel_screw_stroke_color,
+                                 'stroke-width': options.panel_screw_stroke_width, 'fill': options.panel_screw_color}
+        for x, y, _ in corners:
+            plan.holes.append(Hole('screws', x, y, options.panel_screw_radius / 2))
+        # screw head slots
+        if options.panel_screw_type in (2, 3):
+            for x, y, _ in corners:
+                plan.guides.append(line('screws', x - holeR, y, x + holeR, y))
+        if options.panel_screw_type == 3:
+            for x, y, _ in corners:
+                plan.guides.append(line('screws', x, y + holeR, x, y - holeR))
+
+    if not options.panel_holes or panel_type == 'custom':
+        return plan
+    centers = options.panel_centers
+    if options.panel_lasercut:
+        plan.styles['holes'] = {'stroke': Blue, 'stroke-width': lasercut_width, 'fill': 'none'}
+    else:
+        plan.styles['holes'] = {'stroke': 'none', 'stroke-width': '0', 'fill': White}
+    if centers:
+        plan.styles['centers'] = {'stroke': Orange, 'stroke-width': lasercut_width, 'fill': 'none'}
+
+    oval = options.panel_oval and panel_type not in ('api', 'm5u', 'd5u', 'lw', 'serge', 'buchla', 'fracrack')
+    if not oval:
+        right_side = (panel_type in ('e3u', 'e1uij', 'e1upl') and options.eurorack_panel_hp > 10
+                      or panel_type == 'api' and options.api_panel_units >= 2
+                      or panel_type in ('m5u', 'd5u') and options.moog_panel_units >= 2
+                      or panel_type in ('nineteen', 'lw', 'serge', 'buchla')
+                      or panel_type == 'fracrack' and options.fracrack_panel_units > 1)
+        for x, y, name in corners[:2]:
+            plan.holes.append(Hole('holes', x, y, holeR, name=name))
+        if panel_type == 'fracrack' and options.fracrack_panel_units > 2:
+            plan.holes.append(Hole('holes', width / 2, topH, holeR))
+            plan.holes.append(Hole('holes', width / 2, bottomH, holeR))
+        if centers and panel_type == 'fracrack':
+            for y in (topH, bottomH):
+                plan.guides.append(line('centers', width / 2 - holeR + gap, y, width / 2 + holeR - gap, y))
+                plan.guides.append(line('centers', width / 2, y + holeR - gap, width / 2, y - holeR + gap))
+        for x, y, name in corners[:4 if right_side else 2]:
+            if name.endswith('right'):
+                plan.holes.append(Hole('holes', x, y, holeR, name=name))
+            if centers:
+                plan.guides.append(Guide('centers', 'cross', x, y, 2 * (holeR - gap), name=name))
+        return plan
+
+    # Oval holes: a square with rounded corners, 3.2mm hole, oval is 5.5mm across
+    oval_size = 7 if panel_type == 'nineteen' else 5.5
+    oval_stretch = oval_size / 2
+    gapH = oval_stretch * unitfactor - gap
+    oval_offset = (oval_stretch - hole_radius) * unitfactor
+    right_side = (panel_type in ('e3u', 'e1uij', 'e1upl') and options.eurorack_panel_hp > 10
+                  or panel_type == 'lw' and options.lw_panel_units > 2 or panel_type == 'nineteen')
+    for x, y, name in corners[:4 if right_side else 2]:
+        plan.holes.append(Hole('holes', x, y, holeR, oval_size * unitfactor, name))
+        if centers:
+            plan.guides.append(line('centers', x - gapH, y, x + gapH, y))
+            offset = -oval_offset
+            for _ in range(3):
+                plan.guides.append(line('centers', x + offset, y + holeR - gap, x + offset, y - holeR + gap))
+                offset += oval_offset
+    return plan
+
+
+def thin_labels(labels, radii, x, y, angles, n_ticks, size, accent, shifts):
+    # Drop the labels of a knob scale that collide, after trying to push them outwards by `shifts` half sizes
+    candidates, priorities = [], []
+    for label, radius in zip(labels, radii):
+        options = [polar(x, y, radius + shift * size / 2, angles[label.tick]) for shift in shifts]
+        options = [(lx, ly + size / 2) for lx, ly in options]
+        candidates.append([(label_box(lx, ly, label.text, size, padding=size / 10), (lx, ly)) for lx, ly in options])
+        priorities.append(tick_priority(label.tick, n_ticks, accent))
+
+    kept = []
+    boxes = [[box for box, _ in options] for options in candidates]
+    for label, options, choice in zip(labels, candidates, place_labels(boxes, priorities)):
+        if choice is None:
+            continue
+        if choice:
+            label.x, label.y = options[choice][1]
+        kept.append(label)
+    return kept
+
+
+def tick_text(value, taper, rounding, plus_sign):
+    text = format_value(taper, value, rounding)
+    if plus_sign and float(text.rstrip('k')) > 0:
+        return '+' + text
+    return text
+
+
+def plan_knob_scale(options, table, x, y, name):
+    # Arcs, ticks, dots, labels and guides of the scale of a knob centred on (x, y).
+    # table: the spd_taper.ScaleTable of the scale
+    o = options
+    plan = Plan(3, name)
+    angle = o.knob_scale_arc_angle * pi / 180.0
+    arc_rotation = o.knob_scale_arc_rotation * pi / 180.0 * 2
+    radius = o.knob_scale_arc_radius
+    offset_radius = radius + o.knob_scale_outer_arc_offset - (o.knob_scale_arc_width / 2)
+
+    if o.knob_scale_add_centering_circle:
+        plan.styles['centering'] = stroke(o.knob_scale_utilities_centering_color, o.knob_scale_utilities_centering_line_width)
+        plan.guides.append(Guide('centering', 'circle', x, y, r=offset_radius + o.knob_scale_utilities_centering_guide_offset, name='Circle'))
+    if o.knob_scale_utilities_add_drill_guide:
+        drill_guide(plan, 'drilling', x, y, o.knob_scale_utilities_drill_guide_type, o.knob_scale_utilities_guide_dimension,
+                    o.knob_scale_utilities_color, o.knob_scale_utilities_line_width)
+    if o.knob_scale_utilities_add_pcb_component_guide:
+        pcb_guide(plan, 'pcb', x, y, o.knob_scale_utilities_pcb_guide_dimension, o.knob_scale_utilities_pcb_color,
+                  o.knob_scale_utilities_pcb_line_width)
+
+    if o.knob_scale_add_arc or o.knob_scale_add_outer_arc:
+        plan.styles['arcs'] = stroke(o.knob_scale_arc_color, o.knob_scale_arc_width)
+    for add, arc_radius, arc_offset, arc_name in ((o.knob_scale_add_arc, radius, o.knob_scale_arc_angle_offset, 'Main arc'),
+                                                  (o.knob_scale_add_outer_arc, offset_radius, o.knob_scale_outer_arc_angle_offset, 'Outer arc')):
+        if add:
+            end = (angle + arc_offset + arc_rotation - pi) / 2.0
+            plan.arcs.append(Arc('arcs', x, y, arc_radius, pi - end + arc_rotation, end, arc_name))
+
+    n_ticks = o.knob_scale_ticks_number
+    n_subticks = o.knob_scale_subticks_number if o.knob_scale_add_subticks else 0
+    if not o.knob_scale_add_ticks or n_ticks <= 0:
+        return plan
+
+    ticks_start_angle = (1.5 * pi - 0.5 * angle) + (arc_rotation / 2)
+    tick_angles = (ticks_start_angle + angle * table.positions).tolist()
+    subtick_angles = (ticks_start_angle + angle * table.sub_positions).tolist()
+    dots = o.knob_scale_ticks_type != 1
+    inner = radius - (o.knob_scale_arc_width / 2)
+    length_step = (o.knob_scale_ticks_end_lenght - o.knob_scale_ticks_start_lenght) / (n_ticks - 1) if n_ticks > 1 else 0
+    accent = o.knob_scale_ticks_accent_number
+    text_spacing = o.knob_scale_label_offset + 3
+    text_size = o.knob_scale_label_font_size
+    custom_text = o.knob_scale_label_customtext.split(',') if o.knob_scale_label_customtext else []
+    use_custom_text = o.knob_scale_label_add_customtext and o.knob_scale_label_customtext and len(custom_text) == n_ticks
+    suffix = str(o.knob_scale_label_add_suffix) if o.knob_scale_label_add_suffix else ''
+
+    if dots:
+        plan.styles['main'] = filled(o.knob_scale_ticks_color)
+    else:
+        plan.styles['main'] = {'stroke': o.knob_scale_ticks_color}
+    if o.knob_scale_add_tick_dots:
+        plan.styles['dots'] = filled(o.knob_scale_ticks_color)
+    if n_subticks:
+        if o.knob_scale_subticks_type == 1:
+            plan.styles['sub'] = {'fill': 'none', 'stroke': o.knob_scale_subticks_color}
+        else:
+            plan.styles['sub'] = filled(o.knob_scale_subticks_color)
+    if o.knob_scale_add_label:
+        plan.styles['labels'] = label_style(o.knob_scale_label_color, text_size)
+    label_radii = []
+
+    for tick in range(n_ticks):
+        count = tick + 1
+        tick_angle = tick_angles[tick]
+        if not dots:
+            if accent != 0:
+                accented = not tick % accent
+                tick_length = o.knob_scale_ticks_lenght + (o.Knob_scale_ticks_accent_lenght if accented else 0)
+                width = o.knob_scale_ticks_accent_width if accented else o.knob_scale_ticks_width
+            else:
+                tick_length = (length_step * tick) + o.knob_scale_ticks_start_lenght
+                width = o.knob_scale_ticks_width
+            start = inner - o.knob_scale_ticks_offset - tick_length if o.knob_scale_inner_ticks else inner + o.knob_scale_ticks_offset
+            x1, y1 = polar(x, y, start, tick_angle)
+            x2, y2 = polar(x, y, start + tick_length, tick_angle)
+            plan.ticks.append(Tick('main', x1, y1, x2, y2, width=width, name='tick_' + str(count)))
+        else:
+            tick_length = o.knob_scale_ticks_lenght
+            cx, cy = polar(x, y, radius, tick_angle)
+            plan.ticks.append(Tick('main', cx, cy, r=tick_length / 2.0, name='main_tick_' + str(count)))
+
+        # points beyond the main ticks
+        if o.knob_scale_add_tick_dots:
+            dots_offset = 0
+            for i in range(1, o.knob_scale_multiple_dots_number + 1):
+                cx, cy = polar(x, y, radius + tick_length + o.knob_scale_add_tick_dots_offset + dots_offset, tick_angle)
+                dots_offset = dots_offset + o.knob_scale_multiple_dots_offset
+                dot_name = 'tick_dot_' + (str(i) if dots else '') + str(count)
+                plan.ticks.append(Tick('dots', cx, cy, r=o.knob_scale_add_tick_dots_radius / 2.0, name=dot_name))
+
+        if o.knob_scale_add_label:
+            label_radius = radius + tick_length + text_spacing
+            lx, ly = polar(x, y, label_radius, tick_angle)
+            if use_custom_text:
+                text, label_name = custom_text[tick], None
+            else:
+                value = table.values[n_ticks - (tick + 1)] if o.knob_scale_label_reverse_order else table.values[tick]
+                label_name = tick_text(value, o.knob_scale_linlog, o.knob_scale_label_rounding_float, o.knob_scale_add_plus_sign)
+                text = label_name + suffix
+            plan.labels.append(Label('labels', lx, ly + text_size / 2, text, text_size, tick, label_name))
+            label_radii.append(label_radius)
+
+        if tick == n_ticks - 1:
+            break
+
+        subtick_length = o.knob_scale_subticks_lenght
+        for subtick_angle in subtick_angles[tick][:n_subticks]:
+            if o.knob_scale_subticks_type == 1:
+                if o.knob_scale_inner_ticks:
+                    start = radius - o.knob_scale_subticks_offset - subtick_length - (o.knob_scale_arc_width / 2)
+                else:
+                    start = radius + o.knob_scale_subticks_offset
+                x1, y1 = polar(x, y, start, subtick_angle)
+                x2, y2 = polar(x, y, start + subtick_length, subtick_angle)
+                plan.ticks.append(Tick('sub', x1, y1, x2, y2, width=o.knob_scale_subticks_width))
+            else:
+                if o.knob_scale_inner_ticks:
+                    start = inner - o.knob_scale_subticks_offset
+                else:
+                    start = inner + o.knob_scale_subticks_offset
+                cx, cy = polar(x, y, start, subtick_angle)
+                plan.ticks.append(Tick('sub', cx, cy, r=subtick_length / 2.0))
+
+    if o.knob_scale_add_label and o.knob_scale_label_thinning > 1:
+        shifts = range(3) if o.knob_scale_label_thinning == 3 else range(1)
+        plan.labels = thin_labels(plan.labels, label_radii, x, y, tick_angles, n_ticks, text_size, accent, shifts)
+    return plan
+
+
+def plan_slider_scale(options, table, box, name):
+    # Ticks, labels, lines and guides of the scale of a slider.
+    # table: the spd_taper.ScaleTable of the scale, box: (left, top, right, bottom) of the slider course
+    o = options
+    plan = Plan(5, name)
+    left, top, right, bottom = box
+    width, height = right - left, bottom - top
+    h_offset, v_offset = o.slider_scale_h_offset, o.slider_scale_v_offset
+    n_ticks = o.slider_scale_ticks_number
+    n_subticks = o.slider_scale_subticks_number if o.slider_scale_add_subticks else 0
+    start_size, end_size = o.slider_scale_ticks_start_size, o.slider_scale_ticks_end_size
+    text_size = o.slider_scale_label_font_size
+    suffix = o.slider_scale_label_add_suffix or ''
+    # 1 left or top, 2 right or bottom, 3 both
+    first, second = o.slider_scale_position != 2, o.slider_scale_position != 1
+    label_first, label_second = o.slider_scale_label_position != 2, o.slider_scale_label_position != 1
+
+    if n_ticks > 0 and height != width:
+        plan.styles['main'] = {'stroke': o.slider_scale_tick_color}
+        plan.styles['sub'] = {'stroke': o.slider_scale_subtick_color}
+        plan.styles['lines'] = {'stroke': o.slider_scale_tick_color}
+        plan.styles['labels'] = label_style(o.slider_scale_label_color, text_size)
+        steps = max(n_ticks - 1, 1)
+        vertical = height > width
+        ticks_delta = ((height - v_offset) if vertical else (width - h_offset)) / steps
+        tick_offsets = (ticks_delta * (n_ticks - 1) * table.positions).tolist()
+        subtick_offsets = (ticks_delta * (n_ticks - 1) * table.sub_positions).tolist()
+        length_step = (o.slider_scale_ticks_end_lenght - o.slider_scale_ticks_start_lenght) / steps
+        size_step = (end_size - start_size) / steps
+
+        def both(layer, near, far, line_width):
+            # ticks on the left (top) and right (bottom) sides, as the position asks
+            if first and second:
+                # the right side first on vertical scales
+                pair = (far, near) if vertical else (near, far)
+            else:
+                pair = (near,) if first else (far,)
+            for points in pair:
+                plan.ticks.append(Tick(layer, *points, width=line_width))
+
+        for tick in range(n_ticks):
+            tick_length = (length_step * tick) + o.slider_scale_ticks_start_lenght
+            ticksize = (size_step * tick) + start_size
+            if vertical:
+                ty = bottom - tick_offsets[tick] - (v_offset / 2)
+                both('main', (left - h_offset, ty, left - h_offset - tick_length, ty),
+                     (right + h_offset, ty, right + h_offset + tick_length, ty), ticksize)
+            else:
+                tx = left + tick_offsets[tick] + h_offset / 2
+                both('main', (tx, top - v_offset + o.slider_scale_perpendicular_line_width / 2, tx, top - v_offset - tick_length),
+                     (tx, bottom + v_offset - o.slider_scale_perpendicular_line_width / 2, tx, bottom + v_offset + tick_length), ticksize)
+
+            if o.slider_scale_add_label:
+                value = table.values[n_ticks - (tick + 1)] if o.slider_scale_label_reverse_order else table.values[tick]
+                text = tick_text(value, o.slider_scale_linlog, o.slider_scale_label_rounding_float, o.slider_scale_add_plus_sign) + suffix
+                if vertical:
+                    ly = bottom - tick_offsets[tick] - (v_offset / 2) + o.slider_scale_label_offset_adj
+                    near = (left - o.slider_scale_label_offset_tl - tick_length - h_offset - text_size, ly)
+                    far = (right + o.slider_scale_label_offset_br + tick_length + h_offset + text_size, ly)
+                else:
+                    lx = left + tick_offsets[tick] + (h_offset / 2)
+                    near = (lx, top - v_offset - o.slider_scale_label_offset_tl - tick_length - text_size)
+                    far = (lx, bottom + v_offset + o.slider_scale_label_offset_br + tick_length + text_size)
+                for lx, ly in [point for point, wanted in ((near, label_first), (far, label_second)) if wanted]:
+                    plan.labels.append(Label('labels', lx, ly + text_size / 2, text, text_size, tick))
+
+            if tick == n_ticks - 1:
+                break
+
+            subtick_length = o.slider_scale_subtick_lenght
+            for offset in subtick_offsets[tick][:n_subticks]:
+                if vertical:
+                    sy = bottom - offset - (v_offset / 2)
+                    both('sub', (left - h_offset, sy, left - h_offset - subtick_length, sy),
+                         (right + h_offset, sy, right + h_offset + subtick_length, sy), o.slider_scale_subticks_size)
+                else:
+                    sx = left + offset + (h_offset / 2)
+                    both('sub', (sx, top - v_offset + start_size / 2, sx, top - v_offset - subtick_length),
+                         (sx, bottom + v_offset - start_size / 2, sx, bottom + v_offset + subtick_length), o.slider_scale_subticks_size)
+
+        if o.slider_scale_add_perpendicular_line:
+            if vertical:
+                y1 = bottom - (v_offset / 2) + start_size / 2
+                y2 = bottom - ticks_delta * (n_ticks - 1) - (v_offset / 2) - end_size / 2
+                near = (left - h_offset, y1, left - h_offset, y2)
+                far = (right + h_offset, y1, right + h_offset, y2)
+            else:
+                x1 = left + (h_offset / 2) + start_size / 2
+                x2 = left + width - (h_offset / 2) - end_size / 2
+                near = (x1, top - v_offset, x2, top - v_offset)
+                far = (x1, bottom + v_offset, x2, bottom + v_offset)
+            both('lines', near, far, o.slider_scale_perpendicular_line_width)
+
+    if o.slider_scale_utilities_guide_round_edges:
+        corner = min(width, height) / 2
+    else:
+        corner = 0
+    if o.slider_scale_utilities_add_drill_guide:
+        plan.styles['drilling'] = stroke(o.slider_scale_utilities_drill_color, o.slider_scale_utilities_drill_line_width)
+        plan.guides.append(Guide('drilling', 'rect', left, top, width, height, corner))
+    if o.slider_scale_utilities_add_pcb_component_guide:
+        plan.styles['pcb'] = stroke(o.slider_scale_utilities_pcb_color, o.slider_scale_utilities_pcb_line_width)
+        plan.guides.append(Guide('pcb', 'rect', left, top, width, height, corner))
+        # sharecropping lines: the two ends of the travel, then the center cross
+        if width > height:
+            plan.guides.append(line('pcb', left + height / 2, top - 2, left + height / 2, top + height + 2))
+            plan.guides.append(line('pcb', left + width - height / 2, top - 2, left + width - height / 2, top + height + 2))
+        else:
+            plan.guides.append(line('pcb', left - 2, top + width / 2, left + width + 2, top + width / 2))
+            plan.guides.append(line('pcb', left - 2, top + height - width / 2, left + width + 2, top + height - width / 2))
+        plan.guides.append(line('pcb', left + width / 2, top - 2, left + width / 2, top + height + 2))
+        plan.guides.append(line('pcb', left - 2, top + height / 2, left + width + 2, top + height / 2))
+    return plan
+
+
+def plan_jack(options, x, y):
+    # Hole, nut and guides of a jack on (x, y)
+    o = options
+    plan = Plan(6, o.jack_name)
+    jack_radius, jack_thickness, nut_radii = JACKS[o.jack_type]
+    nut_radius = nut_radii.get(o.jack_nut_type, nut_radii[3])
+    plan.styles['jack'] = {'fill': '#000000', 'stroke': o.jack_color, 'stroke-width': str(jack_thickness)}
+    plan.holes.append(Hole('jack', x, y, jack_radius))
+    if o.jack_nut_type in NUTS:
+        plan.styles['nut'] = {'fill': o.jack_nut_color, 'stroke': o.jack_nut_outline_color, 'stroke-width': str(0.1)}
+        plan.holes.append(Hole('nut', x, y, nut_radius + 2 if o.jack_nut_type == 3 else nut_radius, name=NUTS[o.jack_nut_type]))
+
+    if o.jack_utilities_add_drill_guide:
+        drill_guide(plan, 'drilling', x, y, o.jack_utilities_drill_guide_type, o.jack_utilities_guide_dimension,
+                    o.jack_utilities_color, o.jack_utilities_line_width)
+    if o.jack_utilities_add_pcb_component_guide:
+        pcb_guide(plan, 'pcb', x, y, o.jack_utilities_pcb_guide_dimension, o.jack_utilities_pcb_color, o.jack_utilities_pcb_line_width)
+    if o.jack_utilities_add_centering_circle:
+        plan.styles['centering'] = stroke(o.jack_utilities_centering_color, o.jack_utilities_centering_line_width)
+        plan.guides.append(Guide('centering', 'circle', x, y, r=nut_radius + o.jack_utilities_centering_guide_offset))
+    return plan
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Run profile
+
+With the "Profile the run" option (--profile) or SPD_PROFILE set, a run of
+the extension times its phases: argument parsing, loading the document,
+selection and bounding boxes, layer lookup, geometry, DOM emission and
+saving. The report is written next to the document, <name>.spd-profile.txt
+(in the temporary directory for an unsaved document):
+
+    spans        phase times only (SPD_PROFILE=1 too)
+    cprofile     and the functions that took the most time, from cProfile
+    tracemalloc  and the peak memory of every phase with the top allocations
+
+Run metrics
+
+With "Log document metrics" (--metrics) or SPD_METRICS set, every run
+appends a JSON line to <name>.spd-metrics.jsonl next to the document (or
+to the file SPD_METRICS names): the part, the elements it created by type,
+the node count before and after, the size written and how many layers
+share their label with a sibling, the mark of a scale drawn twice:
+
+    {"time": "2026-10-19 17:20:02", "part": 3, "nodes_before": 412, "nodes_after": 530,
+     "created": {"layer": 6, "path": 101, "text": 11}, "bytes": 48211, "duplicate_layers": 1}
+'''
+
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+INKSCAPE = '{http://www.inkscape.org/namespaces/inkscape}'
+
+MODES = ('spans', 'cprofile', 'tracemalloc')
+
+
+class Profiler:
+    # Phase times of one run, a phase lasts until the next one starts
+
+    def __init__(self, mode):
+        self.mode = mode if mode in MODES else 'spans'
+        self.phases = {}  # name: [seconds, peak bytes]
+        self.current = None
+        self.since = time.perf_counter()
+        self.profile = None
+        if self.mode == 'cprofile':
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        elif self.mode == 'tracemalloc':
+            import tracemalloc
+            tracemalloc.start()
+
+    def add(self, name, seconds, peak=0):
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] = max(entry[1], peak)
+
+    def phase(self, name):
+        # End the current phase and start `name`, None only ends it
+        now = time.perf_counter()
+        if self.current is not None:
+            peak = 0
+            if self.mode == 'tracemalloc':
+                import tracemalloc
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.reset_peak()
+            self.add(self.current, now - self.since, peak)
+        self.current = name
+        self.since = time.perf_counter()
+
+    def report(self, title):
+        # Text of the report, the profiling stops here
+        self.phase(None)
+        lines = [title, '', '{:<12} {:>10} {:>10}'.format('phase', 'ms', 'peak kB')]
+        for name, (seconds, peak) in self.phases.items():
+            lines.append('{:<12} {:>10.1f} {:>10}'.format(name, seconds * 1000, '{:.1f}'.format(peak / 1024.0) if peak else ''))
+        lines.append('{:<12} {:>10.1f}'.format('total', sum(seconds for seconds, _ in self.phases.values()) * 1000))
+        if self.profile is not None:
+            import pstats
+            self.profile.disable()
+            stream = io.StringIO()
+            pstats.Stats(self.profile, stream=stream).sort_stats('cumulative').print_stats(40)
+            lines.extend(['', stream.getvalue()])
+        elif self.mode == 'tracemalloc':
+            import tracemalloc
+            statistics = tracemalloc.take_snapshot().statistics('lineno')[:20]
+            tracemalloc.stop()
+            lines.extend(['', 'Top allocations still held at the end:'])
+            lines.extend(str(statistic) for statistic in statistics)
+        return '\n'.join(lines) + '\n'
+
+    def write(self, document, title):
+        # Write the report next to `document`, its path
+        path = sidecar_path(document, '.spd-profile.txt')
+        with open(path, 'w') as stream:
+            stream.write(self.report(title))
+        return path
+
+
+def sidecar_path(document, suffix):
+    # <document name><suffix> next to the document, in the temporary directory when there's no file
+    if document and os.path.isfile(document):
+        return os.path.splitext(document)[0] + suffix
+    return os.path.join(tempfile.gettempdir(), 'spd' + suffix[len('.spd'):])
+
+
+def title(part, arguments):
+    # First lines of a report: what was run, when and with which Python
+    return 'Synth Panels Designer profile, part {}, {}\nPython {}\nArguments: {}'.format(
+        part, time.strftime('%Y-%m-%d %H:%M:%S'), sys.version.split()[0], ' '.join(arguments))
+
+
+def census(root):
+    # (node count, {element type: count}, duplicate layers) of a document, layers counted apart from groups
+    types = Counter()
+    labels = Counter()
+    nodes = 0
+    for element in root.iter():
+        nodes += 1
+        if not isinstance(element.tag, str):
+            continue
+        kind = element.tag.rpartition('}')[2]
+        if kind == 'g' and element.get(INKSCAPE + 'groupmode') == 'layer':
+            kind = 'layer'
+            labels[element.getparent(), element.get(INKSCAPE + 'label')] += 1
+        types[kind] += 1
+    return nodes, types, sum(count - 1 for count in labels.values())
+
+
+def metrics(part, before, after, size):
+    # Record of a run from the census before and after it, size is None when nothing was written
+    created = {kind: count - before[1].get(kind, 0) for kind, count in sorted(after[1].items()) if count != before[1].get(kind, 0)}
+    return {
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'part': part,
+        'nodes_before': before[0],
+        'nodes_after': after[0],
+        'created': created,
+        'bytes': size,
+        'duplicate_layers': after[2],
+    }
+
+
+def append_metrics(target, document, record):
+    # Append a record to the file `target` names, next to the document for '1', its path
+    path = sidecar_path(document, '.spd-metrics.jsonl') if target in ('1', 'true') else target
+    with open(path, 'a') as stream:
+        stream.write(json.dumps(record, sort_keys=True) + '\n')
+    return path
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Parameter schema
+
+The parameters are the ones of SynthPanelsDesigner.inx: name, type, default
+and the notebook page they sit on are read from it once and kept as a table
+in the disk cache, keyed by the .inx file and its time. Values are kept as
+the text given on the command line and converted when they are first read,
+so a run only converts the parameters of the part it draws.
+'''
+
+import os
+
+import inkex
+
+from spd_cache import DiskCache, cache_key
+
+SCHEMA_VERSION = 2
+INX = '{http://www.inkscape.org/namespace/inkscape/extension}'
+
+# notebook page of each part, the parameters outside the notebook are global
+PART_PAGES = {1: 'Panel', 2: 'Knobs', 3: 'Knob_Scale', 4: 'Sliders', 5: 'Slider_Scale', 6: 'Jacks'}
+
+# accepted for older presets and command lines, not in the .inx
+EXTRAS = {
+    'dry_run': ('bool', 'false', None),
+    'author': ('str', '', None),
+    'brand': ('str', '', None),
+    'copyright': ('str', '', None),
+    'releasedate': ('str', '', None),
+    'moduleversion': ('str', '', None),
+    'logo': ('str', '', None),
+    'globalholecolor': ('color', '#cccccc', None),
+    'globalstrokesize': ('str', '', None),
+    'globallasercutcolor': ('color', '#cccccc', None),
+    'globallasercutstrokesize': ('str', '', None),
+    'uitab': ('str', '', None),
+    'panel_screw_tick_color': ('color', '#e6e6e6', 'Panel'),
+    'panel_screw_tick_width': ('float', '0.3', 'Panel'),
+    'knob_presets': ('int', '1', 'Knobs'),
+    'knob_scale_close_arcs': ('bool', 'true', 'Knob_Scale'),
+    'knob_scale_close_arcs_lr': ('int', '0', 'Knob_Scale'),
+    'knob_scale_ticks_lenght': ('float', '1', 'Knob_Scale'),
+    'knob_scale_utilities_component_guide_type': ('int', '0', 'Knob_Scale'),
+    'slider_presets': ('int', '1', 'Sliders'),
+    'jack_utilities_component_guide_type': ('int', '0', 'Jacks'),
+}
+
+CONVERTERS = {
+    'int': int,
+    'float': float,
+    'bool': inkex.Boolean,
+    'color': inkex.Color,
+    'str': str,
+}
+
+_disk = DiskCache('schema', 1024 * 1024)
+_schemas = {}
+
+
+def _kind(param):
+    # converter name of an .inx parameter, option groups of numbers are ints
+    kind = param.get('type')
+    if kind == 'boolean':
+        return 'bool'
+    if kind in ('int', 'float', 'color'):
+        return kind
+    if kind == 'optiongroup':
+        values = [option.get('value') for option in param if option.tag in (INX + 'option', INX + 'item')]
+        return 'int' if values and all(value.lstrip('-').isdigit() for value in values) else 'str'
+    return 'str'
+
+
+def _default(param):
+    # Inkscape's default is the text, option groups and notebooks without one start on their first choice;
+    # the default attribute only fills the colours, their text is empty
+    text = (param.text or '').strip()
+    if text:
+        return text
+    if param.get('type') in ('optiongroup', 'notebook'):
+        for child in param:
+            if child.tag in (INX + 'option', INX + 'item'):
+                return child.get('value')
+            if child.tag == INX + 'page':
+                return child.get('name')
+    return param.get('default') or ''
+
+
+def compile_inx(path):
+    # {name: (kind, default, page)} of every parameter of an .inx file
+    import xml.etree.ElementTree as ET  # only when the cached table is out of date
+    schema = {}
+
+    def walk(element, page):
+        for child in element:
+            if child.tag == INX + 'param':
+                schema[child.get('name')] = (_kind(child), _default(child), page)
+                if child.get('type') == 'notebook':
+                    walk(child, page)
+            elif child.tag == INX + 'page':
+                walk(child, child.get('name'))
+            else:
+                walk(child, page)
+
+    walk(ET.parse(path).getroot(), None)
+    return schema
+
+
+def load_schema(path):
+    # Compiled schema of an .inx file plus the extras, from the disk cache when the .inx is unchanged
+    path = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+    if (path, mtime) in _schemas:
+        return _schemas[path, mtime]
+    key = cache_key('schema', SCHEMA_VERSION, path, mtime)
+    table = _disk.get_json(key)
+    if table is None:
+        table = compile_inx(path)
+        _disk.set_json(key, table)
+    schema = dict(EXTRAS)
+    schema.update((name, tuple(entry)) for name, entry in table.items())
+    _schemas[path, mtime] = schema
+    return schema
+
+
+class Options:
+    # Namespace of the parsed arguments, the schema parameters are converted on first access
+
+    def __init__(self, schema, values, namespace):
+        self.__dict__.update(vars(namespace))
+        self.__dict__['_schema'] = schema
+        self.__dict__['_values'] = values
+
+    def __getattr__(self, name):
+        try:
+            kind, default, _ = self._schema[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        text = self._values.get(name, default)
+        try:
+            value = CONVERTERS[kind](text)
+        except (TypeError, ValueError) as error:
+            raise inkex.AbortExtension('Invalid value for --{}: {!r}'.format(name, text)) from error
+        self.__dict__[name] = value
+        return value
+
+    def convert(self, page):
+        # convert the global parameters and the ones of a notebook page now, bad values fail early
+        for name, (_, _, on_page) in self._schema.items():
+            if on_page is None or on_page == page:
+                getattr(self, name)
+
+
+def param_text(value):
+    # command line text of a value, booleans as the .inx writes them
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    return str(value)
+
+
+def split_arguments(schema, args):
+    # ({name: text} of the schema parameters, the other arguments); --dry-run is --dry_run.
+    # A bare boolean flag is true; a bare flag of another kind takes the next argument
+    # unless that's another flag or the document, the last argument that isn't one.
+    values = {}
+    rest = []
+    args = list(args)
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        index += 1
+        name, equal, text = arg.partition('=')
+        name = name[2:].replace('-', '_') if name.startswith('--') else None
+        if name not in schema:
+            rest.append(arg)
+            continue
+        if not equal:
+            if schema[name][0] == 'bool':
+                text = 'true'
+            elif index < len(args) and not args[index].startswith('--') and \
+                    any(not later.startswith('--') for later in args[index + 1:]):
+                text = args[index]
+                index += 1
+            else:
+                text = ''
+        values[name] = text
+    return values, rest
+
+
+def parse_options(schema, args, parser):
+    # Options of a command line, inkex's own arguments (file, --output, --id) are left to its parser
+    if '-h' in args or '--help' in args:
+        for name, (kind, default, page) in sorted(schema.items()):
+            flags = ['--dry_run', '--dry-run'] if name == 'dry_run' else ['--' + name]
+            # booleans are true when given bare
+            bare = {'nargs': '?', 'const': 'true'} if kind == 'bool' else {}
+            parser.add_argument(*flags, metavar=kind.upper(), help='{} (default {!r})'.format(page or 'Global', default), **bare)
+    values, rest = split_arguments(schema, args)
+    options = Options(schema, values, parser.parse_args(rest))
+    options.convert(PART_PAGES.get(options.part))
+    return options
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Rendering service
+
+A small HTTP server (asyncio, standard library only) for a browser panel
+configurator. POST /render takes a worker request as JSON (see spd_worker)
+and answers with the SVG; the document is sent as "svg" text, or left out
+for a blank page. Renders run in a bounded pool of warm processes:
+
+- identical requests in flight are rendered once and share the answer
+- over --max-pending distinct renders in flight, requests get 503 and Retry-After
+- every answer carries a Server-Timing header (queue, render, total)
+
+GET /health reports the pool counters. It binds to the loopback by default:
+
+    python spd_server.py --port 8750 --workers 4
+    curl -d '{"part": 1, "params": {"panel_type": "e3u", "eurorack_panel_hp": 12}}' localhost:8750/render
+'''
+
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from spd_cache import cache_key
+from spd_worker import render
+
+MAX_BODY = 8 * 1024 * 1024
+REASONS = {
+    200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 422: 'Unprocessable Entity', 503: 'Service Unavailable', 504: 'Gateway Timeout',
+}
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message, headers=()):
+        Exception.__init__(self, message)
+        self.status = status
+        self.headers = list(headers)
+
+
+def warm():
+    # pool initializer, the first render of every process doesn't pay for the imports
+    importlib.import_module('SynthPanelsDesigner')
+
+
+def timed_render(request):
+    start = time.perf_counter()
+    response = render(request)
+    return response, time.perf_counter() - start
+
+
+class RenderService:
+
+    def __init__(self, workers=None, max_pending=16, timeout=30.0):
+        # workers forked from here would hold the open client sockets, the connections wouldn't close
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+        self.pool = ProcessPoolExecutor(workers, mp_context=context, initializer=warm)
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = {}  # request key: future shared by identical requests
+        self.counters = {'rendered': 0, 'coalesced': 0, 'rejected': 0, 'timed_out': 0}
+
+    async def render(self, request):
+        # (worker response, render seconds, shared with an identical request)
+        key = cache_key(request)
+        future = self.pending.get(key)
+        shared = future is not None
+        if shared:
+            self.counters['coalesced'] += 1
+        else:
+            if len(self.pending) >= self.max_pending:
+                self.counters['rejected'] += 1
+                raise HTTPError(503, 'Too many renders in progress', [('Retry-After', '1')])
+            future = asyncio.get_running_loop().run_in_executor(self.pool, timed_render, request)
+            self.pending[key] = future
+            future.add_done_callback(lambda _: self.pending.pop(key, None))
+            self.counters['rendered'] += 1
+        try:
+            response, seconds = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.counters['timed_out'] += 1
+            raise HTTPError(504, 'The render took longer than {:g} s'.format(self.timeout))
+        return response, seconds, shared
+
+    def health(self):
+        return dict(self.counters, pending=len(self.pending), max_pending=self.max_pending)
+
+    async def handle(self, reader, writer):
+        start = time.perf_counter()
+        timing = []
+        try:
+            try:
+                status, content_type, body = await self.route(reader, timing)
+                headers = []
+            except HTTPError as error:
+                status, content_type, body = error.status, 'application/json', json.dumps({'error': str(error)})
+                headers = error.headers
+            timing.append('total;dur={:.1f}'.format((time.perf_counter() - start) * 1000))
+            headers.append(('Server-Timing', ', '.join(timing)))
+            await self.respond(writer, status, content_type, body, headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, reader, timing):
+        # (status, content type, body) of one HTTP request
+        request_line = await reader.readline()
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, 'Bad request line')
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        path = target.split('?', 1)[0]
+        if path == '/health':
+            return 200, 'application/json', json.dumps(self.health())
+        if path != '/render':
+            raise HTTPError(404, 'Unknown path {}'.format(path))
+        if method != 'POST':
+            raise HTTPError(405, 'POST a JSON request to /render')
+
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise HTTPError(400, 'Bad Content-Length')
+        if length < 0:
+            raise HTTPError(400, 'Bad Content-Length')
+        if length > MAX_BODY:
+            raise HTTPError(413, 'Requests are limited to {} bytes'.format(MAX_BODY))
+        try:
+            request = json.loads((await reader.readexactly(length)).decode('utf-8'))
+        except ValueError as error:
+            raise HTTPError(400, 'Bad JSON: {}'.format(error))
+        if not isinstance(request, dict):
+            raise HTTPError(400, 'The request is a JSON object')
+        if 'document' in request:
+            # no reading files of the server on behalf of a browser
+            raise HTTPError(400, 'Send the document as "svg" text')
+        request.pop('id', None)
+
+        queued = time.perf_counter()
+        response, seconds, shared = await self.render(request)
+        waited = time.perf_counter() - queued
+        timing.append('render;dur={:.1f}'.format(seconds * 1000))
+        timing.append('queue;dur={:.1f}'.format(max(waited - seconds, 0.0) * 1000))
+        if shared:
+            timing.append('coalesced')
+
+        if response['status'] != 0:
+            return 422, 'application/json', json.dumps({'status': response['status'], 'messages': response['messages']})
+        if response['output']:
+            # dry run, the plan
+            return 200, 'application/json', response['output']
+        if not response['svg']:
+            return 204, 'image/svg+xml', ''
+        return 200, 'image/svg+xml', response['svg']
+
+    async def respond(self, writer, status, content_type, body, headers):
+        data = body.encode('utf-8')
+        lines = ['HTTP/1.1 {} {}'.format(status, REASONS.get(status, '')),
+                 'Content-Type: {}; charset=utf-8'.format(content_type),
+                 'Content-Length: {}'.format(len(data)),
+                 'Connection: close']
+        lines.extend('{}: {}'.format(name, value) for name, value in headers)
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + data)
+        await writer.drain()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def serve(service, host='127.0.0.1', port=8750):
+    # Listening asyncio server, port 0 picks a free one (server.sockets[0].getsockname())
+    return await asyncio.start_server(service.handle, host, port)
+
+
+async def run(options):
+    service = RenderService(options.workers, options.max_pending, options.timeout)
+    server = await serve(service, options.host, options.port)
+    host, port = server.sockets[0].getsockname()[:2]
+    print('Rendering on http://{}:{}/render'.format(host, port), flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='HTTP rendering service for Synth Panels Designer')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default loopback only)')
+    parser.add_argument('--port', type=int, default=8750, help='Port, 0 for any free one')
+    parser.add_argument('--workers', type=int, help='Render processes (default one per CPU)')
+    parser.add_argument('--max-pending', type=int, default=16, help='Distinct renders in flight before answering 503')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Seconds before a render answers 504')
+    options = parser.parse_args(args)
+    try:
+        asyncio.run(run(options))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Star outlines
+
+Knurled screws, nuts and vintage knobs are Inkscape stars. Only Inkscape
+knows how to draw a sodipodi:type="star" without its path data, so the path
+is generated here with Inkscape's own construction (alternating tip and base
+points, Bezier handles along the tangent for rounded stars). The outline is
+computed once per shape (sides, r2/r1, arg1, arg2, rounded) on a unit star,
+an instance is just a scale and a translate of it.
+'''
+
+from functools import lru_cache
+from math import pi
+
+import numpy as np
+
+
+def fmt(value, decimals=8):
+    # Shortest text of a number rounded to `decimals` places, never '-0'; None keeps every digit
+    if decimals is None:
+        return repr(float(value))
+    text = ('%.*f' % (decimals, value)).rstrip('0').rstrip('.')
+    return '0' if text in ('', '-0') else text
+
+
+def _rot90(vectors):
+    return np.stack([-vectors[:, 1], vectors[:, 0]], axis=1)
+
+
+def _handles(points, prev, next, rounded):
+    # Incoming and outgoing handles of each point, as Inkscape's sp_star_get_curvepoint
+    mid = (prev + next) / 2.0
+    biss = mid + 100000.0 * _rot90(next - prev)
+    away = points - biss
+    rot = _rot90(away / np.linalg.norm(away, axis=1)[:, None])
+    prev_len = np.linalg.norm(prev - points, axis=1)[:, None]
+    next_len = np.linalg.norm(next - points, axis=1)[:, None]
+    return points - rounded * prev_len * rot, points + rounded * next_len * rot
+
+
+@lru_cache(maxsize=128)
+def star_outline(sides, ratio, arg1, arg2, rounded):
+    # (commands, points) of the star centred on the origin with r1 = 1 and r2 = ratio
+    step = 2 * pi / sides
+    angles = np.arange(sides) * step
+    tips = np.stack([np.cos(arg1 + angles), np.sin(arg1 + angles)], axis=1)
+    bases = ratio * np.stack([np.cos(arg2 + angles), np.sin(arg2 + angles)], axis=1)
+    following = np.roll(tips, -1, axis=0)
+
+    if not rounded:
+        points = np.empty((2 * sides, 2))
+        points[0::2] = tips
+        points[1::2] = bases
+        commands = 'M' + 'L' * (2 * sides - 1) + 'Z'
+    else:
+        tips_in, tips_out = _handles(tips, np.roll(bases, 1, axis=0), bases, rounded)
+        bases_in, bases_out = _handles(bases, tips, following, rounded)
+        segments = np.stack([tips_out, bases_in, bases, bases_out, np.roll(tips_in, -1, axis=0), following], axis=1)
+        points = np.concatenate([tips[:1], segments.reshape(-1, 2)])
+        commands = 'M' + 'CC' * sides + 'Z'
+    points.setflags(write=False)
+    return commands, points
+
+
+# points of each path command
+POINTS = {'M': 1, 'L': 1, 'Q': 2, 'C': 3, 'Z': 0}
+
+
+def relative_path(commands, points, decimals=8):
+    # Path data of absolute commands (one letter per segment) and their points, relative after the first move.
+    # The points are rounded before they're subtracted, the rounding errors don't add up along the path.
+    if decimals is not None:
+        points = [(round(x, decimals), round(y, decimals)) for x, y in points]
+    parts = []
+    index = 0
+    current = start = None
+    for command in commands:
+        if command == 'Z':
+            parts.append('z')
+            current = start
+            continue
+        segment = points[index:index + POINTS[command]]
+        index += POINTS[command]
+        if current is None:
+            parts.append('M {},{}'.format(fmt(segment[0][0], decimals), fmt(segment[0][1], decimals)))
+        else:
+            parts.append(command.lower() + ' ' + ' '.join(
+                '{},{}'.format(fmt(x - current[0], decimals), fmt(y - current[1], decimals)) for x, y in segment))
+        current = segment[-1]
+        if command == 'M':
+            start = current
+    return ' '.join(parts)
+
+
+def star_path(cx, cy, sides, r1, r2, arg1, arg2, rounded=0.0, decimals=8):
+    # Path data of an Inkscape star
+    scale = r1 if r1 else r2
+    if not scale or sides < 1:
+        return 'M {},{} Z'.format(fmt(cx, decimals), fmt(cy, decimals))
+    commands, points = star_outline(int(sides), r2 / scale, arg1, arg2, rounded)
+    return relative_path(commands, (points * scale + (cx, cy)).tolist(), decimals)
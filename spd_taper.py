@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Scale tapers
+
+Maps the travel of a knob or a slider (0 at the start of the scale, 1 at the
+end) to the value printed on the scale. Main ticks are evenly spaced along
+the travel and labelled with the value found there; subticks are evenly
+spaced in value between two main ticks, so they crowd like the marks of a
+log ruler on non-linear scales. Tables are cached: many scales with the same
+curve cost one evaluation.
+
+A calibration file replaces the nominal curve with the measured one of a real
+pot: a CSV of (position, value) rows, position 0 at the start of the travel
+and 1 at the end. Ticks are then put where the requested values actually
+land, using monotone cubic (Fritsch-Carlson) interpolation of the position
+over the value.
+'''
+
+import csv
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# --knob_scale_linlog / --slider_scale_linlog
+LINEAR = 1
+LOG = 2
+EXP = 3
+AUDIO_A = 4
+LINEAR_B = 5
+REVERSE_C = 6
+DB = 7
+HZ = 8
+
+# samples of the dense table used to invert the curves
+TABLE_SIZE = 2049
+# dB scales stop at -240 dB from their loudest end
+MIN_GAIN = 1e-12
+
+ScaleTable = namedtuple('ScaleTable', 'positions values sub_positions')
+
+
+def _geometric(start, end):
+    # log scales need two values of the same sign, otherwise fall back to linear
+    return start != 0 and end != 0 and (start > 0) == (end > 0)
+
+
+def taper_values(taper, travel, start, end):
+    # Value printed at each travel position (numpy array in [0, 1])
+    travel = np.asarray(travel, dtype=float)
+    if taper in (LOG, HZ) and _geometric(start, end):
+        return start * (end / start) ** travel
+    if taper == DB:
+        # linear gain along the travel, printed in dB (relative to the loudest end)
+        if start <= end:
+            ratio = max(10.0 ** ((start - end) / 20.0), MIN_GAIN)
+            return end + 20.0 * np.log10(ratio + (1.0 - ratio) * travel)
+        ratio = max(10.0 ** ((end - start) / 20.0), MIN_GAIN)
+        return start + 20.0 * np.log10(1.0 - (1.0 - ratio) * travel)
+    if taper == EXP:
+        shape = (10.0 ** travel - 1.0) / 9.0
+    elif taper == AUDIO_A:
+        # 10% of the value at half travel
+        shape = (81.0 ** travel - 1.0) / 80.0
+    elif taper == REVERSE_C:
+        shape = 1.0 - (81.0 ** (1.0 - travel) - 1.0) / 80.0
+    else:
+        shape = travel
+    return start + (end - start) * shape
+
+
+@lru_cache(maxsize=64)
+def _dense_table(taper, start, end):
+    travel = np.linspace(0.0, 1.0, TABLE_SIZE)
+    values = taper_values(taper, travel, start, end)
+    if values[-1] < values[0]:
+        travel, values = travel[::-1], values[::-1]
+    travel.setflags(write=False)
+    values.setflags(write=False)
+    return travel, values
+
+
+def taper_positions(taper, values, start, end):
+    # Travel position of the given values, inverse of taper_values
+    travel, table = _dense_table(taper, start, end)
+    return np.interp(values, table, travel)
+
+
+@lru_cache(maxsize=256)
+def scale_table(taper, n_ticks, n_subticks, start, end):
+    # Positions and values of the main ticks, positions of the subticks.
+    # sub_positions has one row of n_subticks per interval between main ticks.
+    positions = np.linspace(0.0, 1.0, n_ticks) if n_ticks > 1 else np.zeros(max(n_ticks, 0))
+    values = taper_values(taper, positions, start, end)
+    if n_ticks > 1 and n_subticks > 0:
+        steps = np.arange(1, n_subticks + 1) / (n_subticks + 1.0)
+        if taper in (LINEAR, LINEAR_B) or start == end:
+            sub_positions = positions[:-1, None] + (positions[1:] - positions[:-1])[:, None] * steps[None, :]
+        else:
+            sub_values = values[:-1, None] + (values[1:] - values[:-1])[:, None] * steps[None, :]
+            sub_positions = taper_positions(taper, sub_values, start, end)
+    else:
+        sub_positions = np.zeros((max(n_ticks - 1, 0), 0))
+    for array in (positions, values, sub_positions):
+        array.setflags(write=False)
+    return ScaleTable(positions, values, sub_positions)
+
+
+def format_value(taper, value, rounding):
+    # Label text of a value, 'rounding' decimals (0 = integer)
+    if taper == HZ and abs(value) >= 1000:
+        return '{:g}k'.format(round(value / 1000.0, max(rounding, 1)))
+    if rounding > 0:
+        return str(round(float(value), rounding) + 0.0)
+    if taper in (LINEAR, LINEAR_B):
+        # linear scales keep the truncated labels they always had, the float noise dropped first: 2.9999999999999996 is 3
+        return str(int(round(float(value), 9)))
+    return str(int(round(float(value))))
+
+
+def monotone_slopes(xs, ys):
+    # Fritsch-Carlson tangents of the monotone cubic through (xs, ys), xs increasing
+    h = np.diff(xs)
+    delta = np.diff(ys) / h
+    slopes = np.empty_like(ys)
+    slopes[0], slopes[-1] = delta[0], delta[-1]
+    slopes[1:-1] = (delta[:-1] + delta[1:]) / 2.0
+    # flat at local extrema and along flat segments
+    slopes[1:-1][delta[:-1] * delta[1:] <= 0] = 0.0
+    flat = delta == 0
+    slopes[:-1][flat] = 0.0
+    slopes[1:][flat] = 0.0
+    # keep (alpha, beta) of every segment inside the circle of radius 3
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha = np.where(flat, 0.0, slopes[:-1] / delta)
+        beta = np.where(flat, 0.0, slopes[1:] / delta)
+    norm = alpha * alpha + beta * beta
+    tau = np.where(norm > 9.0, 3.0 / np.sqrt(np.maximum(norm, 9.0)), 1.0)
+    slopes[:-1] *= tau
+    slopes[1:] *= tau
+    return slopes
+
+
+def monotone_interp(x, xs, ys, slopes):
+    # Evaluate the monotone cubic at x (clamped to the range of xs)
+    x = np.clip(np.asarray(x, dtype=float), xs[0], xs[-1])
+    k = np.clip(np.searchsorted(xs, x, side='right') - 1, 0, len(xs) - 2)
+    h = xs[k + 1] - xs[k]
+    t = (x - xs[k]) / h
+    t2 = t * t
+    t3 = t2 * t
+    return ((2 * t3 - 3 * t2 + 1) * ys[k] + (t3 - 2 * t2 + t) * h * slopes[k]
+            + (-2 * t3 + 3 * t2) * ys[k + 1] + (t3 - t2) * h * slopes[k + 1])
+
+
+@lru_cache(maxsize=16)
+def _calibration(path, mtime):
+    positions, values = [], []
+    with open(path, newline='') as stream:
+        for row in csv.reader(stream):
+            try:
+                position, value = float(row[0]), float(row[1])
+            except (IndexError, ValueError):
+                continue  # header or comment
+            positions.append(position)
+            values.append(value)
+    if len(positions) < 2:
+        raise ValueError('{}: a calibration needs at least two (position, value) rows'.format(path))
+
+    order = np.argsort(positions, kind='stable')
+    positions = np.asarray(positions)[order]
+    values = np.asarray(values)[order]
+    steps = np.diff(values)
+    if not (np.all(steps > 0) or np.all(steps < 0)):
+        raise ValueError('{}: calibration values must be strictly increasing or decreasing'.format(path))
+    if steps[0] < 0:
+        positions, values = positions[::-1], values[::-1]
+    # position as a function of the value
+    slopes = monotone_slopes(values, positions)
+    for array in (values, positions, slopes):
+        array.setflags(write=False)
+    return values, positions, slopes
+
+
+def calibration(path):
+    # (values, positions, slopes) of a calibration file, reloaded when it changes
+    return _calibration(os.path.abspath(path), os.path.getmtime(path))
+
+
+@lru_cache(maxsize=64)
+def _calibrated_table(path, mtime, n_ticks, n_subticks, start, end):
+    values, positions, slopes = _calibration(path, mtime)
+    tick_values = np.linspace(start, end, n_ticks) if n_ticks > 1 else np.full(max(n_ticks, 0), float(start))
+    tick_positions = monotone_interp(tick_values, values, positions, slopes)
+    if n_ticks > 1 and n_subticks > 0:
+        steps = np.arange(1, n_subticks + 1) / (n_subticks + 1.0)
+        sub_values = tick_values[:-1, None] + (tick_values[1:] - tick_values[:-1])[:, None] * steps[None, :]
+        sub_positions = monotone_interp(sub_values, values, positions, slopes)
+    else:
+        sub_positions = np.zeros((max(n_ticks - 1, 0), 0))
+    for array in (tick_positions, tick_values, sub_positions):
+        array.setflags(write=False)
+    return ScaleTable(tick_positions, tick_values, sub_positions)
+
+
+def calibrated_table(path, n_ticks, n_subticks, start, end):
+    # Like scale_table, with the ticks at evenly spaced values of a measured curve
+    return _calibrated_table(os.path.abspath(path), os.path.getmtime(path), n_ticks, n_subticks, start, end)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Text to outlines
+
+Fabs and laser shops want no live text, so labels can be written as path
+outlines taken straight from a TTF/OTF file with fontTools (optional, only
+imported when outlines are asked for). Glyphs are outlined once per
+(font, glyph, size): kept in memory for the run and on disk for the next
+ones. Advance widths are used as they are, without kerning.
+'''
+
+import io
+import os
+
+from fontTools.pens.basePen import BasePen
+from fontTools.ttLib import TTFont
+
+from spd_cache import DiskCache, cache_key
+from spd_shapes import relative_path
+
+_fonts = {}
+_glyphs = {}
+_disk = DiskCache('glyphs', 16 * 1024 * 1024)
+
+
+class OutlinePen(BasePen):
+    # Records a glyph as absolute M/L/Q/C/Z segments, scaled to the font size with y down
+
+    def __init__(self, glyphset, scale):
+        BasePen.__init__(self, glyphset)
+        self.scale = scale
+        self.segments = []
+
+    def point(self, pt):
+        return [pt[0] * self.scale, -pt[1] * self.scale]
+
+    def _moveTo(self, pt):
+        self.segments.append(['M'] + self.point(pt))
+
+    def _lineTo(self, pt):
+        self.segments.append(['L'] + self.point(pt))
+
+    def _qCurveToOne(self, pt1, pt2):
+        self.segments.append(['Q'] + self.point(pt1) + self.point(pt2))
+
+    def _curveToOne(self, pt1, pt2, pt3):
+        self.segments.append(['C'] + self.point(pt1) + self.point(pt2) + self.point(pt3))
+
+    def _closePath(self):
+        self.segments.append(['Z'])
+
+
+class Font:
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.mtime = os.path.getmtime(path)
+        # read at once, Inkscape shows the warning of a file left open as an error
+        with open(path, 'rb') as stream:
+            self.ttfont = TTFont(io.BytesIO(stream.read()), lazy=True)
+        self.glyphset = self.ttfont.getGlyphSet()
+        self.cmap = self.ttfont.getBestCmap() or {}
+        self.units = float(self.ttfont['head'].unitsPerEm)
+
+
+def load_font(path):
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    if key not in _fonts:
+        _fonts[key] = Font(path)
+    return _fonts[key]
+
+
+def glyph(font, char, size):
+    # {'advance': width, 'segments': [...]} of a character at a font size
+    name = font.cmap.get(ord(char), '.notdef')
+    key = (font.path, font.mtime, name, size)
+    if key in _glyphs:
+        return _glyphs[key]
+    disk_key = cache_key('glyph', *key)
+    outline = _disk.get_json(disk_key)
+    if outline is None:
+        scale = size / font.units
+        pen = OutlinePen(font.glyphset, scale)
+        if name in font.glyphset:
+            font.glyphset[name].draw(pen)
+            advance = font.glyphset[name].width * scale
+        else:
+            advance = 0.5 * size
+        outline = {'advance': advance, 'segments': pen.segments}
+        _disk.set_json(disk_key, outline)
+    _glyphs[key] = outline
+    return outline
+
+
+def text_width(font, text, size):
+    return sum(glyph(font, char, size)['advance'] for char in text)
+
+
+def text_outline(font, text, size, x, y, anchor='start', decimals=3):
+    # Path data of a line of text with its baseline at y, anchored like SVG text-anchor
+    if anchor == 'middle':
+        x -= text_width(font, text, size) / 2
+    elif anchor == 'end':
+        x -= text_width(font, text, size)
+    commands = []
+    points = []
+    for char in text:
+        outline = glyph(font, char, size)
+        for segment in outline['segments']:
+            commands.append(segment[0])
+            coordinates = segment[1:]
+            points.extend((coordinates[i] + x, coordinates[i + 1] + y) for i in range(0, len(coordinates), 2))
+        x += outline['advance']
+    return relative_path(commands, points, decimals)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Cut and drill ordering
+
+Holes and contours come out of the extension in the order they were drawn,
+so a laser or CNC head zig-zags across the sheet. This module orders them in
+a short tour starting from the machine origin: nearest neighbor over a grid
+index, then 2-opt restricted to each point's nearest neighbors. The outer
+contour, when there is one, is cut last so the panel doesn't drop early.
+'''
+
+import copy
+import math
+
+from lxml import etree
+
+from spd_extract import IDENTITY, INKSCAPE_NS, SHAPES, SVG_NS, multiply, parse_transform, placed_box, shape_box
+
+NEIGHBORS = 8
+MAX_PASSES = 20
+
+
+class GridIndex:
+    # Uniform grid over the points, about two points per cell
+
+    def __init__(self, points):
+        self.points = points
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        self.left, self.top = min(xs), min(ys)
+        area = max(max(xs) - self.left, 1e-9) * max(max(ys) - self.top, 1e-9)
+        self.size = max(math.sqrt(2 * area / len(points)), 1e-9)
+        self.extent = self.cell((max(xs), max(ys)))
+        self.cells = {}
+        for index, point in enumerate(points):
+            self.cells.setdefault(self.cell(point), []).append(index)
+
+    def cell(self, point):
+        return (int((point[0] - self.left) // self.size), int((point[1] - self.top) // self.size))
+
+    def ring(self, center, radius):
+        cx, cy = center
+        if radius == 0:
+            yield center
+            return
+        for x in range(cx - radius, cx + radius + 1):
+            yield (x, cy - radius)
+            yield (x, cy + radius)
+        for y in range(cy - radius + 1, cy + radius):
+            yield (cx - radius, y)
+            yield (cx + radius, y)
+
+    def nearest(self, point, accept, count=1):
+        # the `count` nearest indexes for which accept(index) is true
+        center = self.cell(point)
+        max_radius = max(abs(center[0]), abs(center[0] - self.extent[0]), abs(center[1]), abs(center[1] - self.extent[1]))
+        found = []
+        radius = 0
+        while radius <= max_radius:
+            for key in self.ring(center, radius):
+                for index in self.cells.get(key, ()):
+                    if accept(index):
+                        found.append((distance(point, self.points[index]), index))
+            # everything in the next rings is at least radius * size away
+            if len(found) >= count:
+                found.sort()
+                if found[count - 1][0] <= radius * self.size:
+                    break
+            radius += 1
+        found.sort()
+        return [index for _, index in found[:count]]
+
+    def remove(self, index):
+        self.cells[self.cell(self.points[index])].remove(index)
+
+
+def distance(a, b):
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def travel(points, order, start=(0.0, 0.0)):
+    # Head travel from the start through the points in the given order
+    total = 0.0
+    current = start
+    for index in order:
+        total += distance(current, points[index])
+        current = points[index]
+    return total
+
+
+def nearest_neighbor(points, start=(0.0, 0.0)):
+    grid = GridIndex(points)
+    order = []
+    current = start
+    for _ in range(len(points)):
+        index = grid.nearest(current, lambda i: True)[0]
+        grid.remove(index)
+        order.append(index)
+        current = points[index]
+    return order
+
+
+def two_opt(points, order, start=(0.0, 0.0)):
+    # Open-path 2-opt on the candidate edges towards each point's nearest neighbors
+    nodes = [start] + list(points)
+    tour = [0] + [index + 1 for index in order]
+    count = len(tour)
+    grid = GridIndex(nodes)
+    neighbors = [grid.nearest(node, lambda j, i=i: j != i, NEIGHBORS) for i, node in enumerate(nodes)]
+    position = [0] * count
+    for i, node in enumerate(tour):
+        position[node] = i
+    dist = lambda a, b: distance(nodes[a], nodes[b])
+
+    for _ in range(MAX_PASSES):
+        improved = False
+        for i in range(count - 1):
+            a, b = tour[i], tour[i + 1]
+            for c in neighbors[a]:
+                j = position[c]
+                if j <= i + 1:
+                    continue
+                d = tour[j + 1] if j + 1 < count else None
+                gain = dist(a, b) - dist(a, c)
+                if d is not None:
+                    gain += dist(c, d) - dist(b, d)
+                if gain > 1e-9:
+                    # a-b ... c-d  becomes  a-c ... b-d
+                    tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+                    for k in range(i + 1, j + 1):
+                        position[tour[k]] = k
+                    improved = True
+                    break
+        if not improved:
+            break
+    return [node - 1 for node in tour[1:]]
+
+
+def order_points(points, start=(0.0, 0.0)):
+    # Short open tour through the points starting at `start`
+    if len(points) < 3:
+        return nearest_neighbor(points, start) if points else []
+    return two_opt(points, nearest_neighbor(points, start), start)
+
+
+def parse_style(value):
+    style = {}
+    for declaration in (value or '').split(';'):
+        if ':' in declaration:
+            key, val = declaration.split(':', 1)
+            style[key.strip()] = val.strip()
+    return style
+
+
+def collect_shapes(root):
+    # (element, composed transform, cascaded style) for every shape in the layers
+    shapes = []
+
+    def walk(elem, matrix, style):
+        for child in elem:
+            if not isinstance(child.tag, str) or child.tag.endswith('}defs') or child.tag.endswith('}namedview'):
+                continue
+            child_matrix = multiply(matrix, parse_transform(child.get('transform')))
+            child_style = dict(style)
+            for attribute in ('fill', 'stroke', 'stroke-width'):
+                if child.get(attribute) is not None:
+                    child_style[attribute] = child.get(attribute)
+            child_style.update(parse_style(child.get('style')))
+            child_style.pop('display', None)
+            if child.tag in SHAPES:
+                shapes.append((child, child_matrix, child_style))
+            else:
+                walk(child, child_matrix, child_style)
+
+    walk(root, IDENTITY, {})
+    return shapes
+
+
+def optimize_document(root):
+    # Flatten the shapes of the document into one layer, in tour order.
+    # Returns (shapes, travel before, travel after).
+    shapes = []
+    for elem, matrix, style in collect_shapes(root):
+        box = shape_box(elem, SHAPES[elem.tag])
+        if box is not None:
+            shapes.append((elem, matrix, style, placed_box(matrix, box)))
+    if not shapes:
+        return 0, 0.0, 0.0
+
+    # the contour around all the others is cut last
+    outline = max(range(len(shapes)), key=lambda i: shapes[i][3][2] * shapes[i][3][3])
+    x, y, w, h = shapes[outline][3]
+    if len(shapes) == 1 or not all(
+            abs(s[3][0] - x) <= w / 2 and abs(s[3][1] - y) <= h / 2 for i, s in enumerate(shapes) if i != outline):
+        outline = None
+
+    inner = [i for i in range(len(shapes)) if i != outline]
+    points = [(shape[3][0], shape[3][1]) for shape in shapes]
+    order = [inner[i] for i in order_points([points[i] for i in inner])]
+    if outline is not None:
+        order.append(outline)
+    before = travel(points, range(len(shapes)))
+    after = travel(points, order)
+
+    toolpath = etree.Element('{%s}g' % SVG_NS)
+    toolpath.set('{%s}groupmode' % INKSCAPE_NS, 'layer')
+    toolpath.set('{%s}label' % INKSCAPE_NS, 'Toolpath')
+    toolpath.set('id', 'toolpath')
+    for index in order:
+        elem, matrix, style, _ = shapes[index]
+        placed = copy.deepcopy(elem)
+        placed.tail = None
+        for attribute in ('fill', 'stroke', 'stroke-width'):
+            placed.attrib.pop(attribute, None)
+        if matrix != IDENTITY:
+            placed.set('transform', 'matrix({})'.format(','.join('{:.10g}'.format(v) for v in matrix)))
+        else:
+            placed.attrib.pop('transform', None)
+        if style:
+            placed.set('style', ';'.join('{}:{}'.format(k, v) for k, v in style.items()))
+        toolpath.append(placed)
+
+    for child in list(root):
+        if isinstance(child.tag, str) and not (child.tag.endswith('}defs') or child.tag.endswith('}namedview') or child.tag.endswith('}metadata')):
+            root.remove(child)
+    root.append(toolpath)
+    return len(order), before, after
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Manifest watch
+
+A panel described as a JSON manifest, kept up to date while it's edited:
+
+    {
+        "output": "vcf.svg",
+        "defaults": {"output_precision": 0.01},
+        "panel": {"panel_type": "e3u", "eurorack_panel_hp": 12, "panel_holes": true},
+        "components": [
+            {"id": "Cutoff", "type": "knob", "params": {"knob_pos_define": true, "knob_pos_x": 30, "knob_pos_y": 40},
+             "scale": {"knob_scale_add_ticks": true, "knob_scale_ticks_number": 11}},
+            {"id": "Gain", "type": "slider", "params": {...}, "scale": {...}},
+            {"id": "IN", "type": "jack", "params": {...}}
+        ]
+    }
+
+The knob, slider and jack names default to the component id. The manifest
+is polled; on a change only the components whose specs changed are drawn
+again, in the document kept in memory, and the output is written. Every
+element a component draws is marked with data-spd-source, that's how its
+old drawing is found and taken out. A change of the panel or the defaults
+draws everything again.
+
+    python spd_watch.py vcf.json
+'''
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+import spd_api
+
+SOURCE = 'data-spd-source'
+# layers the extension shares between components and finds again by their id
+SHARED = re.compile(r'^(knobs|knob-scales|sliders|slider-scales|jacks)-(group|utilities)')
+NAMES = {'knob': 'knob_name', 'slider': 'slider_name', 'jack': 'jack_name'}
+
+
+def _shared(element):
+    return element is not None and SHARED.match(element.get('id') or '') is not None
+
+
+def claim(tree, before, source):
+    # Mark what was drawn since `before` (the elements then) as drawn by `source`
+    for element in tree.getroot().iter():
+        if element in before or _shared(element):
+            continue
+        parent = element.getparent()
+        if parent in before or _shared(parent):
+            element.set(SOURCE, source)
+
+
+def remove(tree, source):
+    for element in [element for element in tree.getroot().iter() if element.get(SOURCE) == source]:
+        element.getparent().remove(element)
+
+
+def draw_component(tree, component, defaults):
+    kind = component['type']
+    if kind not in NAMES:
+        raise ValueError('Component {}: unknown type {!r}'.format(component['id'], kind))
+    name = component.get('params', {}).get(NAMES[kind], component['id'])
+    params = dict(defaults, **component.get('params', {}))
+    params[NAMES[kind]] = name
+    before = set(tree.getroot().iter())
+    if kind == 'knob':
+        spd_api.add_knob(tree, params)
+        if 'scale' in component:
+            spd_api.add_knob_scale(tree, dict(defaults, **component['scale']), spd_api.main_shape(tree, 'knob', name))
+    elif kind == 'slider':
+        spd_api.add_slider(tree, params)
+        if 'scale' in component:
+            spd_api.add_slider_scale(tree, dict(defaults, **component['scale']), spd_api.main_shape(tree, 'slider', name))
+    else:
+        spd_api.add_jack(tree, params)
+    claim(tree, before, component['id'])
+
+
+def components(manifest):
+    # {id: component} of a manifest, in drawing order
+    result = {}
+    for component in manifest.get('components', []):
+        if component['id'] in result:
+            raise ValueError('Component id {} is used twice'.format(component['id']))
+        result[component['id']] = component
+    return result
+
+
+class Watch:
+
+    def __init__(self, path, output=None):
+        self.path = path
+        self.output = output
+        self.manifest = None
+        self.tree = None
+
+    def target(self, manifest):
+        output = self.output or manifest.get('output') or os.path.splitext(self.path)[0] + '.svg'
+        return os.path.join(os.path.dirname(os.path.abspath(self.path)), output)
+
+    def render_all(self, manifest):
+        # the document is kept only once every component is drawn
+        defaults = manifest.get('defaults', {})
+        tree = spd_api.render_panel(dict(defaults, **manifest.get('panel', {})))
+        for component in components(manifest).values():
+            draw_component(tree, component, defaults)
+        self.tree = tree
+        return 'drawn', len(manifest.get('components', []))
+
+    def update(self, manifest):
+        # Bring the document in line with the manifest, (what was done, how many components)
+        old = self.manifest
+        if self.tree is None or old.get('panel') != manifest.get('panel') or old.get('defaults') != manifest.get('defaults'):
+            return self.render_all(manifest)
+        defaults = manifest.get('defaults', {})
+        before, after = components(old), components(manifest)
+        changed = [id for id, component in after.items() if before.get(id) != component]
+        for id in changed + [id for id in before if id not in after]:
+            remove(self.tree, id)
+        for id in changed:
+            draw_component(self.tree, after[id], defaults)
+        return 'redrawn', len(changed) + len([id for id in before if id not in after])
+
+    def write(self, manifest):
+        path = self.target(manifest)
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(handle, 'wb') as stream:
+            stream.write(spd_api.tostring(self.tree))
+        os.replace(temporary, path)
+        return path
+
+    def step(self):
+        start = time.perf_counter()
+        try:
+            with open(self.path) as stream:
+                manifest = json.load(stream)
+            done, count = self.update(manifest)
+        except (OSError, ValueError, KeyError) as error:
+            # the output keeps the last good document, the next save of the manifest draws everything again
+            sys.stderr.write('{}: {}\n'.format(self.path, error))
+            self.tree = None
+            return
+        self.manifest = manifest
+        path = self.write(manifest)
+        print('{}: {} {} component(s) in {:.1f} ms'.format(path, done, count, (time.perf_counter() - start) * 1000), flush=True)
+
+    def run(self, interval):
+        mtime = None
+        while True:
+            try:
+                current = os.stat(self.path).st_mtime_ns
+            except OSError:
+                current = None
+            if current is not None and current != mtime:
+                mtime = current
+                self.step()
+            time.sleep(interval)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Redraw a Synth Panels Designer manifest while it is edited')
+    parser.add_argument('manifest', help='JSON manifest of the panel and its components')
+    parser.add_argument('--output', help='SVG file to write (default the manifest "output", or its name)')
+    parser.add_argument('--interval', type=float, default=0.2, help='Seconds between two looks at the manifest')
+    parser.add_argument('--once', action='store_true', help='Draw once and exit')
+    options = parser.parse_args(args)
+
+    watch = Watch(options.manifest, options.output)
+    if options.once:
+        watch.step()
+        return
+    try:
+        watch.run(options.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
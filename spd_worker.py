@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Synth Panels Designer - Free Inkscape extension to draw musical instruments user interfaces
+Copyright (C) 2020 Francesco Mulassano
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Warm worker
+
+Every run of the extension starts Python and imports inkex, lxml and numpy
+before a few milliseconds of drawing. The worker keeps all of that loaded
+and renders one request after the other, read as JSON lines on stdin or on
+a local Unix socket:
+
+    {"document": "panel.svg", "part": 3, "params": {"knob_scale_add_label": true}, "ids": ["knob1"]}
+    {"svg": "<svg ...>...</svg>", "part": 1, "params": {"panel_type": "e3u", "eurorack_panel_hp": 12}}
+
+A request without a document draws on a blank page (see spd_api).
+
+Each request gets one JSON line back, with the request "id" when it has one:
+
+    {"id": 7, "status": 0, "svg": "<svg ...>...</svg>", "messages": "", "output": ""}
+
+"svg" is empty when the part left the document as it was, "messages" is what
+the extension reported and "output" what it printed (the dry run plan).
+
+    python spd_worker.py < requests.jsonl > results.jsonl
+    python spd_worker.py --socket &
+
+While a worker listens on the socket (SPD_WORKER_SOCKET, or a per user
+socket in the temporary directory) SynthPanelsDesigner.py hands its command
+line over to it and only writes the answer; SPD_NO_WORKER=1 turns that off.
+'''
+
+import argparse
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+
+from spd_draft import remember
+
+
+def socket_path():
+    path = os.environ.get('SPD_WORKER_SOCKET')
+    if path:
+        return path
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+    return os.path.join(tempfile.gettempdir(), 'spd-worker-{}.sock'.format(user))
+
+
+def render(request):
+    # Response to one request, the drawing runs here in the worker process
+    import inkex
+    import spd_api
+
+    response = {'status': 0, 'svg': '', 'messages': '', 'output': ''}
+    if 'id' in request:
+        response['id'] = request['id']
+    messages = io.StringIO()
+    printed = io.StringIO()
+    try:
+        with redirect_stderr(messages), redirect_stdout(printed):
+            if 'document' in request:
+                tree = spd_api.load(request['document'])
+            elif 'svg' in request:
+                tree = spd_api.load(request['svg'].encode('utf-8'))
+            else:
+                tree = spd_api.new_document()
+            before = spd_api.tostring(tree)
+            spd_api.draw(tree, int(request.get('part', 1)), request.get('params'), request.get('ids') or ())
+            after = spd_api.tostring(tree)
+        if after != before:
+            response['svg'] = after.decode('utf-8')
+    except inkex.AbortExtension as error:
+        messages.write(str(error) + '\n')
+        response['status'] = inkex.utils.ABORT_STATUS
+    except ValueError as error:
+        # unknown parameters
+        messages.write(str(error) + '\n')
+        response['status'] = 2
+    except Exception as error:
+        messages.write('{}: {}\n'.format(type(error).__name__, error))
+        response['status'] = 1
+    response['messages'] = messages.getvalue()
+    response['output'] = printed.getvalue()
+    return response
+
+
+def serve(lines, stream):
+    # Answer every JSON line of `lines` on the text stream `stream`
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            response = {'status': 2, 'svg': '', 'messages': 'Bad request: {}\n'.format(error), 'output': ''}
+        else:
+            response = render(request)
+        stream.write(json.dumps(response) + '\n')
+        stream.flush()
+
+
+def serve_socket(path):
+    # One connection at a time: the extension writes to the process wide stdout and stderr
+    if os.path.exists(path):
+        os.remove(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen(8)
+    # the socket file goes away on a plain kill too
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            connection, _ = server.accept()
+            with connection, connection.makefile('r', encoding='utf-8') as reader, \
+                    connection.makefile('w', encoding='utf-8') as writer:
+                try:
+                    serve(reader, writer)
+                except OSError:
+                    continue
+    finally:
+        server.close()
+        os.remove(path)
+
+
+def request_from_args(args):
+    # (request, --output) of an extension command line, None when it isn't the --name=value form Inkscape uses
+    request = {'params': {}, 'ids': []}
+    output = None
+    for arg in args:
+        if not arg.startswith('--'):
+            if 'document' in request:
+                return None
+            request['document'] = os.path.abspath(arg)
+            continue
+        name, equal, value = arg[2:].partition('=')
+        if not equal:
+            return None
+        if (name == 'profile' and value != 'off') or (name == 'metrics' and value.lower() == 'true'):
+            # profiled and measured runs are drawn here, the numbers are those of a run
+            return None
+        if name == 'id':
+            request['ids'].append(value)
+        elif name == 'output':
+            output = value
+        elif name == 'part':
+            request['part'] = value
+        elif name != 'selected-nodes':
+            request['params'][name.replace('-', '_')] = value
+    return request, output
+
+
+def hand_off(args):
+    # Exit status of the run done by a listening worker, None to run here
+    if os.environ.get('SPD_NO_WORKER') or os.environ.get('SPD_PROFILE') or os.environ.get('SPD_METRICS') or not hasattr(socket, 'AF_UNIX'):
+        return None
+    path = socket_path()
+    if not os.path.exists(path):
+        return None
+    parsed = request_from_args(args)
+    if parsed is None:
+        return None
+    request, output = parsed
+    try:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(path)
+    except OSError:
+        return None
+    with connection:
+        if 'document' not in request:
+            request['svg'] = sys.stdin.buffer.read().decode('utf-8')
+        connection.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        with connection.makefile('r', encoding='utf-8') as reader:
+            line = reader.readline()
+    if not line:
+        sys.stderr.write('The worker closed the connection\n')
+        return 1
+    response = json.loads(line)
+    sys.stderr.write(response['messages'])
+    sys.stdout.write(response['output'])
+    sys.stdout.flush()
+    if response['svg']:
+        data = response['svg'].encode('utf-8')
+        remember(args, data)
+        if output:
+            with open(output, 'wb') as stream:
+                stream.write(data)
+        else:
+            sys.stdout.buffer.write(data)
+    return response['status']
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Keep Synth Panels Designer loaded and render JSON lines requests')
+    parser.add_argument('--socket', nargs='?', const=socket_path(), help='Listen on a Unix socket (default {}) instead of stdin'.format(socket_path()))
+    options = parser.parse_args(args)
+
+    if options.socket:
+        serve_socket(options.socket)
+    else:
+        serve(sys.stdin, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+import os
+
+from spd_draft import memo_key
+
+
+def test_key_follows_the_calibration_file(tmp_path):
+    document = tmp_path / 'panel.svg'
+    document.write_text('<svg xmlns="http://www.w3.org/2000/svg"/>')
+    calibration = tmp_path / 'pot.csv'
+    calibration.write_text('0,0\n1,1\n')
+    args = ['--part=3', '--draft=true', '--knob_scale_calibration_file={}'.format(calibration), str(document)]
+    before = memo_key(args)
+    assert memo_key(args) == before
+    calibration.write_text('0,0\n0.5,0.1\n1,1\n')
+    os.utime(calibration, ns=(0, os.stat(calibration).st_mtime_ns + 10 ** 9))
+    assert memo_key(args) != before
@@ -0,0 +1,43 @@
+import os
+
+from spd_schema import load_schema, split_arguments
+
+SCHEMA = load_schema(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'SynthPanelsDesigner.inx'))
+
+
+def test_bare_boolean_flag_keeps_the_document():
+    assert split_arguments(SCHEMA, ['--part=6', '--dry-run', 'panel.svg']) == ({'part': '6', 'dry_run': 'true'}, ['panel.svg'])
+
+
+def test_bare_flag_takes_a_value_but_not_the_document():
+    values, rest = split_arguments(SCHEMA, ['--knob_name', 'Cutoff', '--panel_name', 'panel.svg'])
+    assert values == {'knob_name': 'Cutoff', 'panel_name': ''}
+    assert rest == ['panel.svg']
+
+
+def test_bare_flag_does_not_take_another_flag():
+    assert split_arguments(SCHEMA, ['--knob_name', '--id=knob1', 'panel.svg']) == ({'knob_name': ''}, ['--id=knob1', 'panel.svg'])
+
+
+
+def test_dry_run_switch_is_bare(tmp_path):
+    from SynthPanelsDesigner import SynthPanelEffect
+
+    document = tmp_path / 'panel.svg'
+    document.write_text('<svg xmlns="http://www.w3.org/2000/svg"/>')
+    effect = SynthPanelEffect()
+    effect.parse_arguments(['--part=6', '--dry-run', str(document)])
+    assert effect.options.dry_run is True
+    assert effect.options.input_file == str(document)
+
+
+def test_defaults_are_the_inx_text():
+    import xml.etree.ElementTree as ET
+
+    from spd_api import INX
+
+    params = ET.parse(INX).getroot().iter('{http://www.inkscape.org/namespace/inkscape/extension}param')
+    texts = {param.get('name'): (param.text or '').strip() for param in params}
+    assert {name: SCHEMA[name][1] for name, text in texts.items() if text} == {name: text for name, text in texts.items() if text}
+    assert SCHEMA['slider_coarse_gap'][1] == '6'
+    assert SCHEMA['knob_scale_arc_angle'][1] == '45'
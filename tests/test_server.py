@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+from spd_server import RenderService, serve
+
+PANEL = {'part': 1, 'params': {'panel_type': 'e3u', 'eurorack_panel_hp': 12}}
+
+
+async def post(port, body, length=None):
+    # (status, headers, body) of a POST /render
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    data = body.encode('utf-8')
+    writer.write('POST /render HTTP/1.1\r\nHost: localhost\r\nContent-Length: {}\r\n\r\n'.format(
+        len(data) if length is None else length).encode('latin-1') + data)
+    await writer.drain()
+    answer = await reader.read()
+    writer.close()
+    head, _, content = answer.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, content
+
+
+def run(max_pending, client):
+    # client(port, service) against a service on a free loopback port
+    async def main():
+        service = RenderService(1, max_pending)
+        server = await serve(service, port=0)
+        try:
+            return await client(server.sockets[0].getsockname()[1], service)
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+    return asyncio.run(main())
+
+
+def test_identical_requests_are_rendered_once():
+    async def client(port, service):
+        answers = await asyncio.gather(post(port, json.dumps(PANEL)), post(port, json.dumps(PANEL)))
+        return answers, service.health()
+    answers, health = run(4, client)
+    assert [status for status, _, _ in answers] == [200, 200]
+    assert answers[0][2] == answers[1][2]
+    assert health['rendered'] == 1 and health['coalesced'] == 1
+    assert all('render;dur=' in headers['Server-Timing'] for _, headers, _ in answers)
+    assert any('coalesced' in headers['Server-Timing'] for _, headers, _ in answers)
+
+
+def test_over_max_pending_answers_503():
+    other = dict(PANEL, params={'panel_type': 'e3u', 'eurorack_panel_hp': 14})
+    async def client(port, service):
+        return await asyncio.gather(post(port, json.dumps(PANEL)), post(port, json.dumps(other)))
+    statuses = sorted(run(1, client), key=lambda answer: answer[0])
+    assert [status for status, _, _ in statuses] == [200, 503]
+    assert statuses[1][1]['Retry-After'] == '1'
+    assert 'total;dur=' in statuses[1][1]['Server-Timing']
+
+
+def test_bad_content_length_answers_400():
+    async def client(port, service):
+        return await post(port, '{}', length='abc')
+    status, headers, _ = run(1, client)
+    assert status == 400
+    assert 'Server-Timing' in headers
@@ -0,0 +1,32 @@
+import inkex
+import numpy as np
+import pytest
+
+from spd_shapes import star_outline, star_path
+
+
+def inkex_star(sides, ratio, arg1, arg2, rounded):
+    # absolute points of the star inkex draws, as star_outline orders them
+    path = inkex.PathElement.star((0, 0), (1, ratio), sides, rounded, (arg1, arg2)).path.to_absolute()
+    points = []
+    for segment in path:
+        if segment.letter in 'MLC':
+            points.extend(zip(segment.args[0::2], segment.args[1::2]))
+    return np.array(points)
+
+
+@pytest.mark.parametrize('sides', [5, 10, 12, 20])
+def test_rounded_star_matches_inkex(sides):
+    _, points = star_outline(sides, 0.8, 0.3, 0.5, 0.2)
+    assert np.abs(points - inkex_star(sides, 0.8, 0.3, 0.5, 0.2)).max() < 1e-3
+
+
+@pytest.mark.parametrize('rounded', [0.0, 0.2])
+def test_star_path_is_relative_and_exact(rounded):
+    d = star_path(100.123, 50.456, 12, 5, 4, 0.3, 0.5, rounded, 3)
+    assert d.startswith('M ') and 'C' not in d and 'L' not in d
+    absolute = []
+    for segment in inkex.Path(d).to_absolute():
+        absolute.extend(zip(segment.args[0::2], segment.args[1::2]))
+    expected = np.round(star_outline(12, 0.8, 0.3, 0.5, rounded)[1] * 5 + (100.123, 50.456), 3)
+    assert np.abs(np.array(absolute) - expected).max() < 1e-9
@@ -0,0 +1,18 @@
+from spd_taper import DB, HZ, LINEAR, format_value, scale_table
+
+
+def labels(taper, n_ticks, start, end):
+    return [format_value(taper, value, 0) for value in scale_table(taper, n_ticks, 0, start, end).values]
+
+
+def test_db_labels_are_rounded():
+    assert labels(DB, 7, -60, 0) == ['-60', '-16', '-10', '-6', '-4', '-2', '0']
+
+
+def test_hz_labels_are_rounded():
+    assert labels(HZ, 11, 20, 20000) == ['20', '40', '80', '159', '317', '632', '1.3k', '2.5k', '5k', '10k', '20k']
+
+
+def test_linear_labels_are_truncated_as_before():
+    assert labels(LINEAR, 4, 0, 10) == ['0', '3', '6', '10']
+    assert labels(LINEAR, 11, 0, 3) == ['0', '0', '0', '0', '1', '1', '1', '2', '2', '2', '3']
@@ -0,0 +1,35 @@
+import json
+
+import spd_api
+from spd_watch import Watch
+
+
+def save(path, hp, bad=False):
+    knob = {'knob_pos_define': True, 'knob_pos_y': 40}
+    manifest = {
+        'output': 'panel.svg',
+        'panel': {'panel_type': 'e3u', 'eurorack_panel_hp': hp},
+        'components': [
+            {'id': 'K1', 'type': 'knob', 'params': dict(knob, knob_pos_x=15)},
+            {'id': 'K2', 'type': 'knob', 'params': dict(knob, knob_pos_x=40, **({'no_such_param': 1} if bad else {}))},
+        ],
+    }
+    path.write_text(json.dumps(manifest))
+
+
+def test_failed_save_does_not_leave_a_half_drawn_panel(tmp_path, capsys):
+    path = tmp_path / 'panel.json'
+    watch = Watch(str(path))
+    save(path, 12)
+    watch.step()
+    first = (tmp_path / 'panel.svg').read_bytes()
+    save(path, 14, bad=True)
+    watch.step()
+    assert 'no_such_param' in capsys.readouterr().err
+    assert (tmp_path / 'panel.svg').read_bytes() == first
+    save(path, 12)
+    watch.step()
+    tree = spd_api.load(str(tmp_path / 'panel.svg'))
+    assert spd_api.main_shape(tree, 'knob', 'K1') is not None
+    assert spd_api.main_shape(tree, 'knob', 'K2') is not None
+    assert tree.getroot().get('width') == spd_api.load(first).getroot().get('width')
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+from spd_worker import render
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# a knob whose layers have no ids, selected while another layer is the current one
+DOCUMENT = (
+    '<svg xmlns="http://www.w3.org/2000/svg" xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape" '
+    'xmlns:sodipodi="http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd" width="200mm" height="150mm" viewBox="0 0 200 150">'
+    '<sodipodi:namedview id="nv" inkscape:document-units="mm" inkscape:current-layer="layer1"/>'
+    '<g inkscape:groupmode="layer" id="layer1" inkscape:label="Layer 1"/>'
+    '<g inkscape:groupmode="layer" inkscape:label="Knobs Group" id="knobs-group">'
+    '<g inkscape:groupmode="layer" inkscape:label="Cutoff" data-spd-component="knob" data-spd-name="Cutoff">'
+    '<g inkscape:groupmode="layer" inkscape:label="Main color">'
+    '<circle id="knob1" cx="100" cy="75" r="6" style="fill:#fefefe;stroke:#333333;stroke-width:1"/></g></g></g></svg>'
+)
+
+
+def test_handed_off_run_matches_a_local_run(tmp_path):
+    document = tmp_path / 'panel.svg'
+    document.write_text(DOCUMENT)
+    args = ['--part=3', '--id=knob1', '--knob_scale_add_ticks=true']
+    env = dict(os.environ, SPD_NO_WORKER='1', SPD_CACHE_DIR=str(tmp_path / 'cache'))
+    local = subprocess.run([sys.executable, os.path.join(ROOT, 'SynthPanelsDesigner.py')] + args + [str(document)],
+                           env=env, stdout=subprocess.PIPE, check=True).stdout
+    response = render({'document': str(document), 'part': 3, 'params': {'knob_scale_add_ticks': 'true'}, 'ids': ['knob1']})
+    assert response['status'] == 0
+    assert response['svg'].encode('utf-8') == local